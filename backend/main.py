@@ -6,18 +6,23 @@ Handles audio processing, lyrics synchronization, and API endpoints
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 import os
 import sys
 import json
+import asyncio
 from pathlib import Path
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
-from audio_processing import process_song, transcribe_vocals
-from reverse_song_translator import ReverseSongTranslator
+from job_queue import JobQueue, QueueFullError, JOB_QUEUED, JOB_COMPLETED, JOB_FAILED
+from karaoke_pipeline import process_karaoke_song, karaoke_cache_key
+from result_cache import get_result_cache
+from upload_store import store_upload
+from separation_engine import warm_up as warm_up_separation
+from audio_processing import SEPARATION_ENGINES
 
 app = FastAPI(title="Audio Translation & Karaoke API", version="1.0.0")
 
@@ -45,133 +50,139 @@ class ProcessResponse(BaseModel):
     background_path: str
     lyrics: LyricsResponse = None
 
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    file_hash: str = None
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    submitted_at: float
+    finished_at: float = None
+    result: ProcessResponse = None
+    error: str = None
+
 # Ensure output directories exist
 UPLOAD_DIR = Path("uploads")
 OUTPUT_DIR = Path("outputs")
+JOBS_DIR = OUTPUT_DIR / "jobs"
 UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
+JOBS_DIR.mkdir(exist_ok=True)
+
+# How often the event stream checks for new progress events
+EVENT_POLL_INTERVAL = 0.5
+
+def job_events_path(job_id: str) -> Path:
+    return JOBS_DIR / f"{job_id}.events.jsonl"
+
+def remove_job_events(job_id: str):
+    job_events_path(job_id).unlink(missing_ok=True)
+
+# Separation, transcription and translation run in worker processes, not on the event loop
+# Each worker loads the Demucs model once at startup and keeps it resident
+# A job's progress events are deleted when the queue forgets the job
+job_queue = JobQueue(initializer=warm_up_separation, on_evict=remove_job_events)
+
+@app.on_event("shutdown")
+def shutdown_job_queue():
+    job_queue.shutdown(wait=False)
 
 @app.get("/")
 async def root():
     return {"message": "Audio Translation & Karaoke API", "status": "running"}
 
-@app.post("/process-audio", response_model=ProcessResponse)
-async def process_audio(file: UploadFile = File(...)):
+@app.post("/process-audio", response_model=JobResponse, status_code=202)
+async def process_audio(file: UploadFile = File(...), engine: str = "demucs"):
     """
-    Process uploaded audio file for karaoke with synchronized lyrics
+    Queue an uploaded audio file for karaoke processing and return its job ID.
+    engine=fast uses the STFT center channel separator for an instant preview.
     """
+    if engine not in SEPARATION_ENGINES:
+        raise HTTPException(status_code=400, detail=f"Unknown separation engine: {engine}")
+    
     try:
-        # Save uploaded file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        print(f"Processing audio file: {file_path}")
-        
-        # Process the song (separate vocals/background and transcribe)
-        vocals_path, background_path, transcription = process_song(str(file_path), str(OUTPUT_DIR))
+        # Stream the upload to disk under its content hash
+        file_path, file_hash = await store_upload(file, UPLOAD_DIR)
         
-        if not vocals_path or not background_path:
-            raise HTTPException(status_code=500, detail="Audio separation failed")
+        # Songs that were already processed are answered from the result cache
+        cached = get_result_cache().get(karaoke_cache_key(file_hash, engine))
+        if cached is not None:
+            job_id = job_queue.add_completed(cached)
+            return JobResponse(job_id=job_id, status=JOB_COMPLETED, file_hash=file_hash)
         
-        # Get audio duration
-        import subprocess
-        try:
-            result = subprocess.run([
-                'ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-                '-of', 'default=noprint_wrappers=1:nokey=1', str(file_path)
-            ], capture_output=True, text=True, check=True)
-            duration = float(result.stdout.strip())
-        except:
-            duration = 0.0
-        
-        # Create synchronized lyrics
-        lyrics_response = None
-        if transcription and transcription != "TRANSCRIPTION_FAILED":
-            try:
-                # Detect language and translate
-                translator = ReverseSongTranslator()
-                detected_language = translator.detect_language(transcription)
-                
-                if detected_language and detected_language.lower() != "english":
-                    # Translate to English
-                    english_translation = translator.translate_to_english(transcription, str(OUTPUT_DIR / "english_translation.txt"))
-                    
-                    # Create synchronized lyrics with timestamps
-                    original_lyrics = create_timed_lyrics(transcription, duration)
-                    translated_lyrics = create_timed_lyrics(english_translation, duration)
-                    
-                    lyrics_response = LyricsResponse(
-                        original_lyrics=original_lyrics,
-                        translated_lyrics=translated_lyrics,
-                        audio_duration=duration,
-                        vocals_path=str(vocals_path),
-                        background_path=str(background_path)
-                    )
-                else:
-                    # Already in English, create single language lyrics
-                    english_lyrics = create_timed_lyrics(transcription, duration)
-                    lyrics_response = LyricsResponse(
-                        original_lyrics=english_lyrics,
-                        translated_lyrics=english_lyrics,  # Same for English
-                        audio_duration=duration,
-                        vocals_path=str(vocals_path),
-                        background_path=str(background_path)
-                    )
-            except Exception as e:
-                print(f"Lyrics processing error: {e}")
-                # Fallback: create basic lyrics without translation
-                basic_lyrics = create_timed_lyrics(transcription, duration)
-                lyrics_response = LyricsResponse(
-                    original_lyrics=basic_lyrics,
-                    translated_lyrics=basic_lyrics,
-                    audio_duration=duration,
-                    vocals_path=str(vocals_path),
-                    background_path=str(background_path)
-                )
-        
-        return ProcessResponse(
-            success=True,
-            message="Audio processed successfully",
-            vocals_path=str(vocals_path),
-            background_path=str(background_path),
-            lyrics=lyrics_response
+        job_id = job_queue.new_job_id()
+        job_queue.submit(
+            process_karaoke_song, str(file_path), str(OUTPUT_DIR), file_hash,
+            str(job_events_path(job_id)), engine, job_id=job_id
         )
+        print(f"Queued audio file {file_path} as job {job_id}")
         
+        return JobResponse(job_id=job_id, status=JOB_QUEUED, file_hash=file_hash)
+        
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        print(f"Error processing audio: {e}")
+        print(f"Error queueing audio: {e}")
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
-def create_timed_lyrics(text: str, duration: float) -> list:
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
     """
-    Create synchronized lyrics with timestamps
+    Get the status of a processing job, with its result once completed
     """
-    if not text or duration <= 0:
-        return []
+    job = job_queue.get(job_id)
     
-    # Split text into lines/phrases
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    if not lines:
-        return []
+    return JobStatusResponse(**job)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream a job's pipeline progress as server-sent events until it finishes
+    """
+    if job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    # Calculate timing for each line
-    time_per_line = duration / len(lines)
+    events_path = job_events_path(job_id)
     
-    timed_lyrics = []
-    for i, line in enumerate(lines):
-        start_time = i * time_per_line
-        end_time = (i + 1) * time_per_line
-        
-        timed_lyrics.append({
-            "text": line,
-            "start": round(start_time, 2),
-            "end": round(end_time, 2),
-            "duration": round(time_per_line, 2)
-        })
+    async def event_stream():
+        offset = 0
+        while True:
+            # Read the status before draining, so events written before completion are not missed
+            job = job_queue.get(job_id)
+            if job is None:
+                # Pruned while streaming (result TTL or finished-job limit); its events are gone too
+                final = {"job_id": job_id, "status": "expired", "error": "Job expired before the stream finished"}
+                yield f"event: done\ndata: {json.dumps(final)}\n\n"
+                return
+            try:
+                with open(events_path, "r", encoding="utf-8") as f:
+                    f.seek(offset)
+                    while True:
+                        line = f.readline()
+                        if not line.endswith("\n"):
+                            break  # Incomplete line, read it on the next pass
+                        offset = f.tell()
+                        yield f"event: progress\ndata: {line.strip()}\n\n"
+            except FileNotFoundError:
+                pass  # Not written yet, or removed with a pruned job
+            
+            if job["status"] in (JOB_COMPLETED, JOB_FAILED):
+                final = {"job_id": job_id, "status": job["status"], "error": job["error"]}
+                yield f"event: done\ndata: {json.dumps(final)}\n\n"
+                return
+            
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
     
-    return timed_lyrics
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/download/{file_type}/{filename}")
 async def download_file(file_type: str, filename: str):
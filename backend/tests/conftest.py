@@ -0,0 +1,6 @@
+"""Make the flat backend/utils modules importable the same way the pipeline scripts do."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "utils"))
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from audio import chunk_bounds, split_audio_array
+
+SAMPLE_RATE = 1000
+
+
+def song_with_pauses(seconds, pauses):
+    """Noise with silent half-second gaps starting at the given times."""
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, seconds * SAMPLE_RATE).astype(np.float32)
+    for pause in pauses:
+        audio[int(pause * SAMPLE_RATE):int((pause + 0.5) * SAMPLE_RATE)] = 0
+    return audio
+
+
+def test_fixed_bounds_tile_the_audio():
+    audio = np.zeros(250 * SAMPLE_RATE, dtype=np.float32)
+    bounds = chunk_bounds(audio, SAMPLE_RATE, max_duration=60, silence_aware=False)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(audio)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(bounds, bounds[1:]))
+    assert [end - start for start, end in bounds] == [60000, 60000, 60000, 60000, 10000]
+
+
+def test_silence_aware_bounds_cut_in_pauses_within_the_limit():
+    audio = song_with_pauses(150, pauses=[52, 105])
+    bounds = chunk_bounds(audio, SAMPLE_RATE, max_duration=60)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(audio)
+    assert all(end - start <= 60 * SAMPLE_RATE for start, end in bounds)
+    for _, end in bounds[:-1]:
+        assert np.all(audio[end - 50:end + 50] == 0)
+
+
+def test_overlap_extends_chunks_backwards_only():
+    audio = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+    chunks = split_audio_array(audio, SAMPLE_RATE, max_duration=4, silence_aware=False, overlap=1.0)
+    assert [chunk[0] for chunk in chunks] == [0, 3000, 7000]
+    assert chunks[-1][-1] == audio[-1]
+
+
+def test_busy_hedge_threads_fall_back_to_serial(monkeypatch):
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    import audio
+
+    release = threading.Event()
+
+    def slow(**kwargs):
+        release.wait(5)
+        return "slow", None
+
+    def fast(**kwargs):
+        return "fast", None
+
+    monkeypatch.setattr(audio, "report", lambda *args, **kwargs: None)
+    monkeypatch.setattr(audio, "_hedge_pool", ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr(audio, "_hedge_slots", threading.BoundedSemaphore(2))
+    try:
+        # The slow backend loses the race and keeps its hedge thread
+        first = audio._transcribe_hedged([("slow", slow), ("fast", fast)], {}, delay=0.01)
+        assert first == ("fast", None)
+        # A loser of another chunk holds the other thread
+        audio._hedge_slots.acquire()
+        audio._hedge_pool.submit(audio._run_hedged, audio._hedge_slots, "slow", slow, {})
+        started = time.monotonic()
+        second = audio._transcribe_hedged([("fast", fast)], {}, delay=0.01)
+        assert second == ("fast", None)
+        assert time.monotonic() - started < 1  # ran in the calling thread, not queued
+    finally:
+        release.set()
+        audio._hedge_pool.shutdown()
@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+import boson_client
+
+
+@pytest.fixture(autouse=True)
+def no_clients(monkeypatch):
+    monkeypatch.setattr(boson_client, "_clients", {})
+    monkeypatch.delenv("BOSON_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+
+def test_missing_key_is_reported():
+    with pytest.raises(ValueError):
+        boson_client.get_client()
+
+
+def test_key_set_after_import_is_used(monkeypatch):
+    monkeypatch.setenv("BOSON_API_KEY", "late-key")
+    client = boson_client.get_client()
+    assert client.api_key == "late-key"
+    assert boson_client.get_client() is client
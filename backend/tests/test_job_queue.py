@@ -0,0 +1,74 @@
+import os
+import time
+
+from job_queue import JOB_COMPLETED, JOB_FAILED, JobQueue
+
+
+def test_completed_job_is_reported():
+    queue = JobQueue(max_workers=1)
+    job_id = queue.add_completed({"ok": True})
+    status = queue.get(job_id)
+    assert status["status"] == JOB_COMPLETED
+    assert status["result"] == {"ok": True}
+
+
+def test_finished_jobs_beyond_the_limit_are_pruned_oldest_first():
+    queue = JobQueue(max_workers=1, max_finished=3)
+    job_ids = [queue.add_completed(i) for i in range(5)]
+    assert len(queue._jobs) == 4  # pruned before each insert
+    assert queue.get(job_ids[0]) is None
+    assert queue.get(job_ids[-1])["result"] == 4
+    assert len(queue._jobs) == 3
+
+
+def test_expired_jobs_are_pruned():
+    queue = JobQueue(max_workers=1, result_ttl=60)
+    job_id = queue.add_completed("old")
+    queue._jobs[job_id]["finished_at"] -= 120
+    fresh = queue.add_completed("new")
+    assert queue.get(job_id) is None
+    assert queue.get(fresh)["result"] == "new"
+
+
+def test_unfinished_jobs_are_never_pruned():
+    queue = JobQueue(max_workers=1, max_finished=1, result_ttl=1)
+    queue._jobs["running"] = {"future": None, "submitted_at": 0, "finished_at": None}
+    queue.add_completed(1)
+    queue.add_completed(2)
+    assert "running" in queue._jobs
+
+
+def _crash():
+    os._exit(1)
+
+
+def _answer():
+    return 42
+
+
+def test_queue_recovers_from_a_dead_worker():
+    queue = JobQueue(max_workers=1)
+    try:
+        crashed = queue.submit(_crash)
+        deadline = time.time() + 30
+        while queue.get(crashed)["status"] != JOB_FAILED and time.time() < deadline:
+            time.sleep(0.05)
+        assert queue.get(crashed)["status"] == JOB_FAILED
+
+        job_id = queue.submit(_answer)
+        deadline = time.time() + 30
+        while queue.get(job_id)["status"] != JOB_COMPLETED and time.time() < deadline:
+            time.sleep(0.05)
+        assert queue.get(job_id)["result"] == 42
+    finally:
+        queue.shutdown()
+
+
+def test_evicted_jobs_are_passed_to_on_evict():
+    evicted = []
+    queue = JobQueue(max_workers=1, max_finished=1, on_evict=evicted.append)
+    first = queue.add_completed(1)
+    second = queue.add_completed(2)
+    assert evicted == []  # pruned before insert, so the limit is only exceeded here
+    queue.get(second)
+    assert evicted == [first]
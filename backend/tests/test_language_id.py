@@ -0,0 +1,35 @@
+from language_id import identify_language, identify_text_language
+
+
+def test_empty_text_is_unknown():
+    assert identify_text_language("") == ("Unknown", 0.0)
+    assert identify_text_language("123 !!!") == ("Unknown", 0.0)
+
+
+def test_stopword_free_latin_text_is_unknown():
+    # Regression: zero-score diacritic entries used to divide by zero
+    assert identify_text_language("Despacito") == ("Unknown", 0.0)
+    assert identify_text_language("hello") == ("Unknown", 0.0)
+
+
+def test_latin_languages_from_stopwords():
+    language, confidence = identify_text_language(
+        "I love you and you love me, all that I want is you in my arms tonight")
+    assert language == "English" and confidence > 0.5
+    language, _ = identify_text_language("Pero yo te quiero, mi amor, con todo mi corazón y no se para")
+    assert language == "Spanish"
+
+
+def test_diacritics_alone_identify_language():
+    assert identify_text_language("niño año señor")[0] == "Spanish"
+
+
+def test_non_latin_scripts():
+    assert identify_text_language("사랑해요 너를")[0] == "Korean"
+    assert identify_text_language("君のことが好きだよ")[0] == "Japanese"
+    assert identify_text_language("我爱你")[0] == "Chinese"
+    assert identify_text_language("Я тебя люблю")[0] == "Russian"
+
+
+def test_identify_language_without_audio_returns_text_result():
+    assert identify_language("hello") == ("Unknown", 0.0)
@@ -0,0 +1,90 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, cached_chat_completion, request_key
+from language_id import is_language_name
+
+
+class FakeClient:
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.answer))])
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "true")
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    return cache
+
+
+def request(text="Hola"):
+    return {"model": "m", "messages": [{"role": "user", "content": text}], "temperature": 0.1}
+
+
+def test_request_key_ignores_surrounding_whitespace_only():
+    assert request_key(**request(" Hola ")) == request_key(**request("Hola"))
+    assert request_key(**request("Hola")) != request_key(**request("Hello"))
+    assert request_key(**request()) != request_key(**{**request(), "temperature": 0.2})
+
+
+def test_repeated_request_is_served_from_cache(cache):
+    client = FakeClient("Spanish")
+    first = cached_chat_completion(client, **request())
+    second = cached_chat_completion(client, **request())
+    assert client.calls == 1
+    assert first.choices[0].message.content == second.choices[0].message.content == "Spanish"
+
+
+@pytest.mark.parametrize("answer", ["Unknown", "<think>hmm</think> Probably Spanish", ""])
+def test_invalid_language_answers_are_not_cached(cache, answer):
+    client = FakeClient(answer)
+    cached_chat_completion(client, accept=is_language_name, **request())
+    cached_chat_completion(client, accept=is_language_name, **request())
+    assert client.calls == 2
+
+
+def test_expired_entries_are_misses(cache):
+    cache.put("k", "m", "value", ttl=-1)
+    assert cache.get("k") is None
+
+
+def test_eviction_keeps_most_recently_used(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"), max_bytes=10)
+    cache.put("old", "m", "123456")
+    cache.put("new", "m", "abcdef")
+    cache.get("new")
+    cache.evict()
+    assert cache.get("old") is None
+    assert cache.get("new") == "abcdef"
+
+
+def test_insert_counter_is_exact_across_threads(tmp_path, monkeypatch):
+    # Regression: the eviction trigger counter was updated without a lock
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+    evictions = []
+    monkeypatch.setattr(cache, "evict", lambda: evictions.append(1))
+    threads = [threading.Thread(target=lambda i=i: [cache.put(f"{i}-{j}", "m", "x") for j in range(25)])
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache._inserts == 200
+    assert len(evictions) == 200 // llm_cache.EVICT_EVERY
+
+
+def test_is_language_name():
+    assert is_language_name("Spanish")
+    assert is_language_name(" french. ")
+    assert not is_language_name("Unknown")
+    assert not is_language_name("The language is Spanish")
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from two_step_lyrics_processor import get_fallback_stats, parse_lyrics_output, post_process_clean_lyrics
+import two_step_lyrics_processor
+
+
+def test_lyrics_block_after_reasoning_is_extracted():
+    answer = "<think>draft <lyrics>borrador</lyrics></think>\n<lyrics>\nHola\n\n  Adiós  \n</lyrics>"
+    assert parse_lyrics_output(answer) == "Hola\nAdiós"
+
+
+def test_text_before_a_stray_closing_think_tag_is_reasoning():
+    assert parse_lyrics_output("reasoning <lyrics>no</lyrics> </think><lyrics>sí</lyrics>") == "sí"
+
+
+@pytest.mark.parametrize("answer", [
+    None, "", "Hola\nAdiós", "<lyrics>   </lyrics>",
+    "<think>cut off while thinking <lyrics>draft</lyrics>",
+])
+def test_answers_breaking_the_contract_are_rejected(answer):
+    assert parse_lyrics_output(answer) is None
+
+
+def test_fallback_rate_is_recorded(monkeypatch):
+    monkeypatch.setattr(two_step_lyrics_processor, "_stats", {"single_call": 0, "fallback": 0})
+    monkeypatch.setattr(two_step_lyrics_processor, "report", lambda *args, **kwargs: None)
+    two_step_lyrics_processor._record_parse("Spanish", fallback=False)
+    two_step_lyrics_processor._record_parse("Spanish", fallback=True)
+    assert get_fallback_stats() == {"single_call": 2, "fallback": 1, "fallback_rate": 0.5}
+
+
+def test_step2_cleanup_drops_lyrics_delimiters():
+    assert post_process_clean_lyrics("<lyrics>\nHola\n</lyrics>") == "Hola"
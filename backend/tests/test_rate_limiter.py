@@ -0,0 +1,86 @@
+import pytest
+
+openai = pytest.importorskip("openai")
+httpx = pytest.importorskip("httpx")
+
+import rate_limiter
+from rate_limiter import AdaptiveLimiter, classify_error, retry_after_seconds
+
+REQUEST = httpx.Request("POST", "https://example.invalid/v1/chat/completions")
+
+
+def status_error(status, headers=None):
+    response = httpx.Response(status, headers=headers or {}, request=REQUEST)
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_BACKOFF", 0.001)
+    monkeypatch.setattr(rate_limiter, "report", lambda *args, **kwargs: None)
+
+
+def failing(errors, result="ok"):
+    """A call that raises the given errors in turn, then succeeds."""
+    errors = list(errors)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+    return call, calls
+
+
+def test_only_429_and_503_are_retried():
+    assert classify_error(status_error(429)) == (True, True)
+    assert classify_error(status_error(503)) == (True, True)
+    assert classify_error(status_error(500)) == (False, True)
+    assert classify_error(status_error(400)) == (False, False)
+    assert classify_error(openai.APITimeoutError(request=REQUEST)) == (False, True)
+    assert classify_error(ValueError("bad")) == (False, False)
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(status_error(429, {"retry-after": "2"})) == 2.0
+    assert retry_after_seconds(status_error(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(status_error(429)) is None
+
+
+def test_rate_limited_call_is_retried_and_halves_concurrency():
+    limiter = AdaptiveLimiter("m", rate=0, max_concurrency=8)
+    call, calls = failing([status_error(429, {"retry-after-ms": "1"})])
+    assert limiter.call(call) == "ok"
+    assert len(calls) == 2
+    assert 4 <= limiter.concurrency < 5
+    assert limiter.in_flight == 0
+
+
+def test_timeout_is_not_retried():
+    # Regression: a stalled request must reach the caller's own fallback at once
+    limiter = AdaptiveLimiter("m", rate=0, max_concurrency=8)
+    call, calls = failing([openai.APITimeoutError(request=REQUEST)])
+    with pytest.raises(openai.APITimeoutError):
+        limiter.call(call)
+    assert len(calls) == 1
+    assert limiter.concurrency == 4
+    assert limiter.in_flight == 0
+
+
+def test_retries_stop_at_the_retry_window(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_RETRY_WINDOW", 0.5)
+    limiter = AdaptiveLimiter("m", rate=0)
+    call, calls = failing([status_error(429, {"retry-after": "5"})])
+    with pytest.raises(openai.APIStatusError):
+        limiter.call(call)
+    assert len(calls) == 1
+
+
+def test_success_grows_concurrency_additively():
+    limiter = AdaptiveLimiter("m", rate=0, max_concurrency=8)
+    limiter.concurrency = 2.0
+    for _ in range(2):
+        limiter.acquire()
+        limiter.release("success")
+    assert 2.8 < limiter.concurrency < 3.0
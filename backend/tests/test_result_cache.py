@@ -0,0 +1,58 @@
+import os
+
+from result_cache import ResultCache, cache_key
+
+
+def test_cache_key_depends_on_audio_pipeline_and_params():
+    key = cache_key("abc", "karaoke", language="Spanish")
+    assert key == cache_key("abc", "karaoke", language="Spanish")
+    assert key != cache_key("abd", "karaoke", language="Spanish")
+    assert key != cache_key("abc", "single_song", language="Spanish")
+    assert key != cache_key("abc", "karaoke", language="French")
+
+
+def test_put_copies_artifacts_and_rewrites_paths(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    stem = tmp_path / "vocals.wav"
+    stem.write_bytes(b"RIFF")
+    key = cache_key("abc", "karaoke")
+
+    stored = cache.put(key, {"vocals": str(stem), "text": "la la"}, artifacts=[str(stem)])
+    stem.unlink()
+
+    assert stored["vocals"] != str(stem)
+    assert os.path.exists(stored["vocals"])
+    assert cache.get(key) == stored
+
+
+def test_restore_copies_artifacts_out_of_the_cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    stem = tmp_path / "vocals.wav"
+    stem.write_bytes(b"RIFF")
+    stored = cache.put("key", {"vocals": str(stem), "text": "la la"}, artifacts=[str(stem)])
+
+    target = tmp_path / "out" / "stems" / "song_vocals.wav"
+    restored = cache.restore(stored, {"vocals": str(target)})
+    assert restored == {"vocals": str(target), "text": "la la"}
+    assert target.read_bytes() == b"RIFF"
+
+    os.remove(stored["vocals"])  # evicted meanwhile
+    assert cache.restore(stored, {"vocals": str(target)}) is None
+
+
+def test_miss_returns_none(tmp_path):
+    assert ResultCache(str(tmp_path / "cache")).get("missing") is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+    blob = tmp_path / "blob.bin"
+    blob.write_bytes(b"x" * 1000)
+    cache.put("old", {"file": str(blob)}, artifacts=[str(blob)])
+    cache.put("new", {"file": str(blob)}, artifacts=[str(blob)])
+    os.utime(os.path.join(cache.cache_dir, "old", "result.json"), (1, 1))
+
+    cache.max_bytes = 1500
+    cache.evict()
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
@@ -0,0 +1,40 @@
+from transcript_merge import longest_suffix_prefix, merge_transcripts, seam_overlap, trim_seams
+
+
+def test_longest_suffix_prefix():
+    assert longest_suffix_prefix(["a", "b", "c"], ["b", "c", "d"]) == 2
+    assert longest_suffix_prefix(["a", "b"], ["c"]) == 0
+    assert longest_suffix_prefix([], ["a"]) == 0
+    assert longest_suffix_prefix(["x", "a", "a"], ["a", "a", "a"]) == 2
+
+
+def test_duplicated_seam_words_are_removed():
+    texts = ["I walk the line tonight", "the line tonight and forever"]
+    assert trim_seams(texts) == ["I walk the line tonight", "and forever"]
+    assert merge_transcripts(texts) == "I walk the line tonight and forever"
+
+
+def test_seam_match_ignores_case_and_punctuation():
+    assert trim_seams(["Hold me, Closer", "hold me closer tiny dancer"]) == ["Hold me, Closer", "tiny dancer"]
+
+
+def test_single_repeated_word_is_not_treated_as_seam():
+    assert trim_seams(["say yes", "yes we can"]) == ["say yes", "yes we can"]
+
+
+def test_one_word_overlap_next_to_cut_off_word():
+    # Regression: the cut-off "fo" hid a one-word overlap from the two-word minimum
+    assert trim_seams(["one two three fo", "three four five six"]) == ["one two three", "four five six"]
+    assert seam_overlap("one two three fo".split(), "three four five six".split(), 40) == (1, 1)
+
+
+def test_failed_middle_chunk_does_not_link_its_neighbours():
+    # Regression: chunks 0 and 2 share no audio, so nothing may be trimmed between them
+    assert trim_seams(["one two three", "", "two three four"]) == ["one two three", "", "two three four"]
+    assert trim_seams(["one two three", None, "two three four"]) == ["one two three", "", "two three four"]
+
+
+def test_overlap_search_is_bounded():
+    a = ("x " * 50 + "a b c").split()
+    b = ("a b c " + "y " * 50).split()
+    assert seam_overlap(a, b, max_tokens=10) == (0, 3)
@@ -0,0 +1,112 @@
+import pytest
+
+import translation_memory
+from translation_memory import (memory_context, normalize_line, numbered_request,
+                                parse_numbered_lines, translate_many_with_memory,
+                                translate_with_memory)
+
+
+@pytest.fixture(autouse=True)
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRANSLATION_MEMORY_ENABLED", "true")
+    monkeypatch.setattr(translation_memory, "_memory",
+                        translation_memory.TranslationMemory(str(tmp_path / "memory.sqlite3")))
+
+
+class FakeTranslator:
+    """Answers numbered requests like a well-behaved model, prefixing each line."""
+
+    def __init__(self, prefix="ES: "):
+        self.prefix = prefix
+        self.calls = []
+
+    def __call__(self, lines):
+        self.calls.append(list(lines))
+        answer = "<think>planning</think>\nHere you go:\n" + "\n".join(
+            f"{i}. {self.prefix}{line}" for i, line in enumerate(lines, 1))
+        return parse_numbered_lines(answer, len(lines))
+
+
+def test_normalize_line_ignores_case_spacing_and_edge_punctuation():
+    assert normalize_line("  Hello   World! ") == normalize_line("hello world")
+
+
+def test_numbered_request_round_trips():
+    lines = ["I want you", "The night is young"]
+    request = numbered_request(lines)
+    assert request.startswith("1. I want you\n2. The night is young")
+    assert parse_numbered_lines("1. Te quiero\n2. La noche es joven", 2) == ["Te quiero", "La noche es joven"]
+
+
+@pytest.mark.parametrize("answer", [
+    "1. uno\n3. tres",              # skipped line
+    "1. uno\n1. otra vez\n2. dos",  # duplicated number
+    "1. uno\n2.",                   # empty translation
+    "uno\ndos",                     # no numbering
+    "",
+])
+def test_parse_numbered_lines_rejects_answers_that_are_not_one_to_one(answer):
+    assert parse_numbered_lines(answer, 2) is None
+
+
+def test_chorus_is_sent_once_and_expanded():
+    song = "Verse one\nLa la la\nI love you\nLa la la\n\nI love you!\nla la la"
+    translate = FakeTranslator()
+    result = translate_with_memory(song, "English", "Spanish", translate, context="c")
+    assert translate.calls == [["Verse one", "La la la", "I love you"]]
+    assert result.split("\n") == ["ES: Verse one", "ES: La la la", "ES: I love you", "ES: La la la",
+                                  "ES: I love you", "ES: La la la"]
+
+
+def test_known_lines_are_not_sent_again():
+    translate = FakeTranslator()
+    translate_with_memory("Line one\nChorus", "English", "Spanish", translate, context="c")
+    translate_with_memory("Chorus\nLine two", "English", "Spanish", translate, context="c")
+    assert translate.calls[-1] == ["Line two"]
+    assert translate_with_memory("Chorus", "English", "Spanish", translate, context="c") == "ES: Chorus"
+    assert len(translate.calls) == 2
+
+
+def test_entries_are_kept_apart_by_language_pair_and_context():
+    translate_with_memory("Chorus", "English", "Spanish", FakeTranslator("A: "), context="c")
+    other = FakeTranslator("B: ")
+    assert translate_with_memory("Chorus", "English", "French", other, context="c") == "B: Chorus"
+    assert translate_with_memory("Chorus", "English", "Spanish", other, context="d") == "B: Chorus"
+    assert memory_context("model", "prompt", True) != memory_context("model", "prompt", False)
+
+
+def test_unmappable_answer_is_not_stored_and_defers_to_caller():
+    assert translate_with_memory("One\nTwo", "English", "Spanish", lambda lines: None, context="c") is None
+    translate = FakeTranslator()
+    translate_with_memory("One\nTwo", "English", "Spanish", translate, context="c")
+    assert translate.calls == [["One", "Two"]]
+
+
+def test_batch_sends_only_lines_some_language_is_missing():
+    translate_with_memory("Chorus", "English", "Spanish", FakeTranslator("ES: "), context="c")
+    calls = []
+
+    def translate_lines(lines, languages):
+        calls.append((list(lines), list(languages)))
+        answers = {language: [f"{language[:2].upper()}: {line}" for line in lines] for language in languages}
+        answers.pop("German", None)  # unusable answer for one language
+        return answers
+
+    result = translate_many_with_memory("Verse\nChorus", "English", ["Spanish", "French", "German"],
+                                        translate_lines, context="c")
+    assert calls == [(["Verse", "Chorus"], ["Spanish", "French", "German"])]
+    assert result == {"Spanish": "SP: Verse\nES: Chorus", "French": "FR: Verse\nFR: Chorus"}
+
+    result = translate_many_with_memory("Chorus\nVerse", "English", ["Spanish", "French"],
+                                        translate_lines, context="c")
+    assert len(calls) == 1
+    assert result == {"Spanish": "ES: Chorus\nSP: Verse", "French": "FR: Chorus\nFR: Verse"}
+
+
+def test_unknown_source_language_or_disabled_memory_is_bypassed(monkeypatch):
+    translate = FakeTranslator()
+    assert translate_with_memory("One", "Unknown", "Spanish", translate) is None
+    assert translate_with_memory("One", None, "Spanish", translate) is None
+    monkeypatch.setenv("TRANSLATION_MEMORY_ENABLED", "false")
+    assert translate_with_memory("One", "English", "Spanish", translate) is None
+    assert translate.calls == []
@@ -1,4 +1,6 @@
-from boson_client import client
+from boson_client import get_client
+
+client = get_client()
 resp = client.chat.completions.create(
     model="higgs-audio-understanding-Hackathon",
     messages=[{"role":"user","content":"Say hello from Boson AI!"}]
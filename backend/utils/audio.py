@@ -1,8 +1,54 @@
 import base64
 import os
+import random
 import subprocess
 import sys
-from boson_client import client
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
+from boson_client import get_client
+from llm_cache import cached_chat_completion
+from progress import report
+from audio_buffer import decode_audio, duration_of, encode_wav_bytes, to_mono
+from speech_payload import prepare_speech_payload, to_speech_audio
+from local_asr import get_local_asr
+from lyrics_timeline import distribute_lines, offset_segments
+from transcript_merge import trim_seams
+
+# Chunks transcribed at once by transcribe_long_audio
+TRANSCRIPTION_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CONCURRENCY", "4"))
+# Seconds before each chunk limit searched for a silence to cut at
+CHUNK_SILENCE_TOLERANCE = float(os.getenv("CHUNK_SILENCE_TOLERANCE", "10"))
+# Seconds of audio each chunk shares with the previous one; duplicated words are merged at the seams
+CHUNK_OVERLAP = float(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP", "0"))
+# Upper bound on words sung per second, to size the seam search
+OVERLAP_WORDS_PER_SECOND = 4
+# Try the resident local Whisper model before the remote models instead of after them
+LOCAL_ASR_PRIMARY = os.getenv("LOCAL_ASR_PRIMARY", "false").lower() in ("1", "true", "yes")
+# Ask the local model for per-word timings for the karaoke timeline
+LOCAL_ASR_WORD_TIMESTAMPS = os.getenv("LOCAL_ASR_WORD_TIMESTAMPS", "true").lower() in ("1", "true", "yes")
+# Seconds to wait for a transcription backend before starting the next one in parallel.
+# Off (0, strict fallback order) by default; set it near the primary backend's p95 latency to enable hedging
+TRANSCRIPTION_HEDGE_DELAY = float(os.getenv("TRANSCRIPTION_HEDGE_DELAY", "0"))
+# Threads for hedged requests, including losers still running until their request timeout
+TRANSCRIPTION_HEDGE_THREADS = int(os.getenv("TRANSCRIPTION_HEDGE_THREADS", "0")) or None
+# Chunk re-transcriptions allowed per song, rounds of retries per chunk and the first backoff in seconds
+TRANSCRIPTION_RETRY_BUDGET = int(os.getenv("TRANSCRIPTION_RETRY_BUDGET", "4"))
+TRANSCRIPTION_MAX_RETRIES = int(os.getenv("TRANSCRIPTION_MAX_RETRIES", "2"))
+TRANSCRIPTION_RETRY_BACKOFF = float(os.getenv("TRANSCRIPTION_RETRY_BACKOFF", "2"))
+# Upper bound on a single remote transcription request, in seconds
+TRANSCRIPTION_REQUEST_TIMEOUT = float(os.getenv("TRANSCRIPTION_REQUEST_TIMEOUT", "180"))
+
+# Placeholder returned when every transcription method fails
+FALLBACK_MARKER = "[AUDIO TRANSCRIPTION NEEDED]"
+
+HIGGS_TRANSCRIPTION_PROMPT = "You are a professional audio transcriptionist. Transcribe this audio file COMPLETELY from start to finish.\n\nCRITICAL OUTPUT REQUIREMENTS:\n- Output ONLY the transcribed lyrics\n- Do NOT include any explanations, analysis, or metadata\n- Do NOT include phrases like 'Here is the transcription' or 'The lyrics are'\n- Do NOT include any text that is not part of the actual song lyrics\n- Transcribe EVERY SINGLE WORD from beginning to end\n- Include ALL lyrics, verses, choruses, and repetitions\n- If any part is unclear, mark it as [UNCLEAR] but continue\n- Preserve the exact structure and line breaks\n- Return ONLY the clean lyrics, nothing else"
+WHISPER_TRANSCRIPTION_PROMPT = "Transcribe this audio completely and accurately.\n\nCRITICAL OUTPUT REQUIREMENTS:\n- Output ONLY the transcribed lyrics\n- Do NOT include any explanations or metadata\n- Do NOT include phrases like 'Here is the transcription'\n- Include ALL lyrics from beginning to end\n- Do not truncate or abbreviate\n- Return ONLY the clean lyrics, nothing else"
+
+_hedge_pool = None
+_hedge_slots = None
+_hedge_pool_lock = threading.Lock()
 
 def encode_audio(file_path: str) -> str:
     """Convert audio file to base64."""
@@ -21,13 +67,14 @@ def get_audio_duration(file_path: str) -> float:
         print(f"Error getting audio duration: {e}")
         return 0.0
 
-def split_audio_file(file_path: str, max_duration: int = 60) -> list:
+def split_audio_file(file_path: str, max_duration: int = 60, overlap: float = 0.0) -> list:
     """
     Split a long audio file into smaller chunks.
     
     Args:
         file_path (str): Path to the audio file
         max_duration (int): Maximum duration per chunk in seconds
+        overlap (float): Seconds each chunk also covers before its start
         
     Returns:
         list: List of paths to the split audio files
@@ -44,13 +91,13 @@ def split_audio_file(file_path: str, max_duration: int = 60) -> list:
     num_chunks = int(duration // max_duration) + 1
     
     for i in range(num_chunks):
-        start_time = i * max_duration
+        start_time = max(0, i * max_duration - overlap)
         chunk_file = os.path.join(output_dir, f"{os.path.basename(base_name)}_chunk_{i+1}{extension}")
         
         try:
             subprocess.run([
                 "ffmpeg", "-i", file_path, "-ss", str(start_time), 
-                "-t", str(max_duration), "-c", "copy", chunk_file, "-y"
+                "-t", str(i * max_duration + max_duration - start_time), "-c", "copy", chunk_file, "-y"
             ], check=True, capture_output=True)
             chunk_files.append(chunk_file)
         except Exception as e:
@@ -58,146 +105,471 @@ def split_audio_file(file_path: str, max_duration: int = 60) -> list:
     
     return chunk_files
 
-def transcribe_long_audio(file_path: str, max_tokens=4096, max_chunk_duration=90):
+def find_silence_boundaries(audio, sample_rate: int, max_duration: float, tolerance: float = None,
+                            frame_duration: float = 0.02, smoothing: float = 0.3) -> list:
+    """
+    Choose chunk boundaries in the quietest spot before each max_duration limit, so
+    chunks end in pauses between phrases instead of in the middle of a word.
+    
+    Args:
+        audio (np.ndarray): Audio shaped (channels, samples) or (samples,), ideally the vocals stem
+        sample_rate (int): Sample rate of the audio
+        max_duration (float): Maximum chunk duration in seconds (never exceeded)
+        tolerance (float): How far before the limit to look for silence, in seconds
+        frame_duration (float): Energy frame size in seconds
+        smoothing (float): Energy smoothing window in seconds, so short dips inside words are ignored
+        
+    Returns:
+        list: Sample offsets of chunk starts, beginning with 0
+    """
+    tolerance = CHUNK_SILENCE_TOLERANCE if tolerance is None else tolerance
+    mono = to_mono(audio)
+    frame = max(1, int(frame_duration * sample_rate))
+    num_frames = len(mono) // frame
+    if num_frames == 0:
+        return [0]
+    
+    # Frame energy (vectorized), smoothed with a moving average
+    energy = np.square(mono[:num_frames * frame].reshape(num_frames, frame)).mean(axis=1)
+    width = max(1, int(smoothing / frame_duration))
+    energy = np.convolve(energy, np.ones(width) / width, mode="same")
+    
+    max_frames = max(1, int(max_duration / frame_duration))
+    window_frames = min(max_frames - 1, int(tolerance / frame_duration))
+    
+    starts = [0]
+    start_frame = 0
+    while start_frame + max_frames < num_frames:
+        limit = start_frame + max_frames
+        lo = limit - window_frames
+        cut = lo + int(np.argmin(energy[lo:limit])) if window_frames > 0 else limit
+        starts.append(cut * frame)
+        start_frame = cut
+    return starts
+
+def chunk_bounds(audio, sample_rate: int, max_duration: int = 60, silence_aware: bool = True) -> list:
+    """
+    Plan chunk boundaries over an audio array.
+    
+    Returns:
+        list: (start, end) sample ranges that tile the audio
+    """
+    total = audio.shape[-1]
+    if silence_aware:
+        starts = find_silence_boundaries(audio, sample_rate, max_duration)
+    else:
+        starts = list(range(0, total, int(max_duration * sample_rate)))
+    ends = starts[1:] + [total]
+    return list(zip(starts, ends))
+
+def split_audio_array(audio, sample_rate: int, max_duration: int = 60, silence_aware: bool = True,
+                      overlap: float = 0.0) -> list:
+    """
+    Split an in-memory audio array into chunks without copying.
+    
+    Args:
+        audio (np.ndarray): Audio shaped (channels, samples) or (samples,)
+        sample_rate (int): Sample rate of the audio
+        max_duration (int): Maximum duration per chunk in seconds
+        silence_aware (bool): Cut in the nearest silence before each limit instead of at fixed offsets
+        overlap (float): Seconds each chunk also covers before its start
+        
+    Returns:
+        list: Array views, one per chunk
+    """
+    pad = int(overlap * sample_rate)
+    return [audio[..., max(0, start - pad):end]
+            for start, end in chunk_bounds(audio, sample_rate, max_duration, silence_aware)]
+
+def transcribe_long_audio(file_path: str = None, max_tokens=4096, max_chunk_duration=90, audio=None, sample_rate=None,
+                          max_concurrency=None, return_segments=False, retry_budget=None, overlap=None):
     """
     Transcribe a potentially long audio file by splitting it if necessary.
+    Chunks are transcribed concurrently and reassembled in order; chunks that fail
+    are retried on their own (see transcribe_chunks).
     
     Args:
         file_path (str): Path to the audio file
         max_tokens (int): Maximum tokens per transcription request
         max_chunk_duration (int): Maximum duration per chunk in seconds
+        audio (np.ndarray): Decoded audio to use instead of file_path, shaped (channels, samples)
+        sample_rate (int): Sample rate of audio
+        max_concurrency (int): Chunks transcribed at once (default TRANSCRIPTION_CONCURRENCY)
+        return_segments (bool): Also return the lyric timeline
+        retry_budget (int): Chunk retries allowed for this audio (default TRANSCRIPTION_RETRY_BUDGET)
+        overlap (float): Seconds shared by neighbouring chunks (default TRANSCRIPTION_CHUNK_OVERLAP)
         
     Returns:
-        str: Complete transcription
+        str: Complete transcription, or (transcription, segments) with return_segments, where
+            segments are {"start", "end", "text", "words"} per line in song time
     """
-    duration = get_audio_duration(file_path)
+    if audio is not None:
+        duration = duration_of(audio, sample_rate)
+    else:
+        duration = get_audio_duration(file_path)
     
+    chunk_files = []
     if duration <= max_chunk_duration:
-        # File is short enough, transcribe directly
-        return transcribe_audio(file_path, max_tokens)
+        # Short enough, transcribe as a single chunk
+        chunks = [{"file_path": file_path} if audio is None else {"audio": audio, "sample_rate": sample_rate}]
+        spans = [(0.0, duration)]
+        return _combine_chunks(transcribe_chunks(chunks, max_tokens, max_concurrency, retry_budget),
+                               spans, [0.0], return_segments)
     
-    # File is too long, split it
-    print(f"Audio file is {duration:.1f} seconds long, splitting into chunks...")
-    chunk_files = split_audio_file(file_path, max_chunk_duration)
-    
-    transcriptions = []
-    for i, chunk_file in enumerate(chunk_files):
-        print(f"Transcribing chunk {i+1}/{len(chunk_files)}...")
+    # Too long, split it
+    print(f"Audio is {duration:.1f} seconds long, splitting into chunks...")
+    if audio is None:
         try:
-            chunk_transcription = transcribe_audio(chunk_file, max_tokens)
-            transcriptions.append(chunk_transcription)
+            # Decode so chunk boundaries can be placed in silences
+            audio, sample_rate = decode_audio(file_path)
         except Exception as e:
-            print(f"Error transcribing chunk {i+1}: {e}")
-            transcriptions.append(f"[Error transcribing chunk {i+1}]")
-    
-    # Clean up chunk files
-    for chunk_file in chunk_files:
-        if chunk_file != file_path:  # Don't delete the original file
-            try:
-                os.remove(chunk_file)
-            except Exception as e:
-                print(f"Error removing chunk file {chunk_file}: {e}")
-    
-    # Combine transcriptions
-    complete_transcription = " ".join(transcriptions)
-    return complete_transcription
-
-def transcribe_audio(file_path: str, max_tokens=4096):
-    """Transcribe an audio file using multiple fallback methods."""
-    print(f"🎤 Transcribing audio: {file_path}", file=sys.stderr)
-    
-    # Method 1: Try Higgs Audio Understanding
-    try:
-        print("📝 Method 1: Trying Higgs Audio Understanding...", file=sys.stderr)
-        audio_b64 = encode_audio(file_path)
-        fmt = file_path.split(".")[-1].lower()
-
-        response = client.chat.completions.create(
-            model="higgs-audio-understanding-Hackathon",
-            messages=[
-                {"role": "system", "content": "You are a professional audio transcriptionist. Transcribe this audio file COMPLETELY from start to finish.\n\nCRITICAL OUTPUT REQUIREMENTS:\n- Output ONLY the transcribed lyrics\n- Do NOT include any explanations, analysis, or metadata\n- Do NOT include phrases like 'Here is the transcription' or 'The lyrics are'\n- Do NOT include any text that is not part of the actual song lyrics\n- Transcribe EVERY SINGLE WORD from beginning to end\n- Include ALL lyrics, verses, choruses, and repetitions\n- If any part is unclear, mark it as [UNCLEAR] but continue\n- Preserve the exact structure and line breaks\n- Return ONLY the clean lyrics, nothing else"},
-                {"role": "user", "content": [
-                    {
-                        "type": "input_audio",
-                        "input_audio": {"data": audio_b64, "format": fmt}
-                    }
-                ]},
-            ],
-            max_completion_tokens=8192,
-            temperature=0.0,
-        )
-
-        transcription = response.choices[0].message.content.strip()
-        if transcription and len(transcription) > 10:  # Basic validation
-            print("✅ Higgs Audio Understanding successful!")
-            return clean_transcription_output(transcription)
-        else:
-            print("⚠️ Higgs Audio Understanding returned empty/short result")
-            raise Exception("Empty transcription result")
-            
-    except Exception as e:
-        print(f"❌ Higgs Audio Understanding failed: {e}", file=sys.stderr)
+            print(f"Could not decode {file_path} ({e}), cutting at fixed offsets", file=sys.stderr)
+    
+    overlap = CHUNK_OVERLAP if overlap is None else overlap
+    if audio is not None:
+        bounds = chunk_bounds(audio, sample_rate, max_chunk_duration)
+        pad = int(overlap * sample_rate)
+        chunks = [{"audio": audio[..., max(0, start - pad):end], "sample_rate": sample_rate}
+                  for start, end in bounds]
+        spans = [(start / float(sample_rate), end / float(sample_rate)) for start, end in bounds]
+    else:
+        chunk_files = split_audio_file(file_path, max_chunk_duration, overlap)
+        chunks = [{"file_path": chunk_file} for chunk_file in chunk_files]
+        spans = [(i * max_chunk_duration, min((i + 1) * max_chunk_duration, duration)) for i in range(len(chunks))]
+    # Where each chunk's audio actually begins, including the overlap
+    offsets = [max(0.0, start - overlap) for start, _ in spans]
     
-    # Method 2: Try Whisper via Boson AI
     try:
-        print("📝 Method 2: Trying Whisper via Boson AI...", file=sys.stderr)
-        audio_b64 = encode_audio(file_path)
-        fmt = file_path.split(".")[-1].lower()
-
-        response = client.chat.completions.create(
-            model="whisper-1",
-            messages=[
-                {"role": "system", "content": "Transcribe this audio completely and accurately.\n\nCRITICAL OUTPUT REQUIREMENTS:\n- Output ONLY the transcribed lyrics\n- Do NOT include any explanations or metadata\n- Do NOT include phrases like 'Here is the transcription'\n- Include ALL lyrics from beginning to end\n- Do not truncate or abbreviate\n- Return ONLY the clean lyrics, nothing else"},
-                {"role": "user", "content": [
-                    {
-                        "type": "input_audio",
-                        "input_audio": {"data": audio_b64, "format": fmt}
-                    }
-                ]},
-            ],
-            max_completion_tokens=4096,
-            temperature=0.0,
-        )
-
-        transcription = response.choices[0].message.content.strip()
-        if transcription and len(transcription) > 10:
-            print("✅ Whisper transcription successful!")
-            return clean_transcription_output(transcription)
+        results = transcribe_chunks(chunks, max_tokens, max_concurrency, retry_budget)
+    finally:
+        # Clean up chunk files
+        for chunk_file in chunk_files:
+            if chunk_file != file_path:  # Don't delete the original file
+                try:
+                    os.remove(chunk_file)
+                except Exception as e:
+                    print(f"Error removing chunk file {chunk_file}: {e}")
+    
+    return _combine_chunks(results, spans, offsets, return_segments)
+
+def _combine_chunks(results, spans, offsets, return_segments=False):
+    """
+    Join chunk transcripts in order, leaving out chunks that still failed if any succeeded.
+    When chunks overlap, words transcribed on both sides of a seam are kept only once.
+    """
+    usable = [not _needs_retry(result) for result in results]
+    if not any(usable):
+        usable = [True] * len(results)
+    texts = [result["text"] if ok else "" for result, ok in zip(results, usable)]
+    
+    overlap = max([span[0] - offset for span, offset in zip(spans, offsets)] or [0.0])
+    if overlap > 0:
+        texts = trim_seams(texts, int(overlap * OVERLAP_WORDS_PER_SECOND) + 4)
+    complete_transcription = " ".join(text for text, ok in zip(texts, usable) if ok and text)
+    if not return_segments:
+        return complete_transcription
+    
+    # Chunk offsets place each chunk's lines in song time; ASR timings refine them when available
+    segments = []
+    for result, text, ok, (start, end), offset in zip(results, texts, usable, spans, offsets):
+        if not ok or _needs_retry(result):
+            continue
+        if result["segments"]:
+            # Segments heard in the overlap belong to the previous chunk
+            segments.extend(
+                segment for segment in offset_segments(result["segments"], offset)
+                if (segment["start"] + segment["end"]) / 2 >= start
+            )
         else:
-            print("⚠️ Whisper returned empty/short result")
-            raise Exception("Empty transcription result")
-            
+            segments.extend(distribute_lines(text, start, end))
+    return complete_transcription, segments
+
+def _needs_retry(result):
+    """A chunk needs another attempt if it raised or every method fell through to the placeholder."""
+    return bool(result["error"]) or FALLBACK_MARKER in (result["text"] or "")
+
+def _transcribe_chunk(index, total, chunk, max_tokens, attempt=0):
+    """Transcribe one chunk and capture its outcome instead of raising."""
+    print(f"Transcribing chunk {index+1}/{total}..." + (f" (retry {attempt})" if attempt else ""))
+    chunk_start = time.perf_counter()
+    result = {"index": index, "text": None, "segments": None, "error": None, "duration": None, "attempts": attempt + 1}
+    try:
+        result["text"], result["segments"] = transcribe_audio(max_tokens=max_tokens, return_segments=True, **chunk)
     except Exception as e:
-        print(f"❌ Whisper transcription failed: {e}", file=sys.stderr)
+        print(f"Error transcribing chunk {index+1}: {e}")
+        result["text"] = f"[Error transcribing chunk {index+1}]"
+        result["error"] = str(e)
+    result["duration"] = round(time.perf_counter() - chunk_start, 3)
     
-    # Method 3: Try local Whisper (if available)
-    try:
-        print("📝 Method 3: Trying local Whisper...", file=sys.stderr)
-        import whisper
+    report("chunk_transcribed", chunk=index + 1, total=total, attempt=attempt,
+           status="error" if _needs_retry(result) else "ok",
+           duration=result["duration"], error=result["error"])
+    return result
+
+def transcribe_chunks(chunks, max_tokens=4096, max_concurrency=None, retry_budget=None):
+    """
+    Transcribe chunks concurrently, so latency is close to that of the slowest chunk.
+    
+    Chunks that fail or come back as the fallback placeholder are retried on their
+    own, with exponential backoff and jitter, until they succeed, the per-chunk
+    retry limit is reached or the song's retry budget is spent. Successful chunks
+    are never transcribed again.
+    
+    Args:
+        chunks (list): transcribe_audio() keyword arguments per chunk
+            ({"file_path": ...} or {"audio": ..., "sample_rate": ...})
+        max_tokens (int): Maximum tokens per transcription request
+        max_concurrency (int): Chunks transcribed at once (default TRANSCRIPTION_CONCURRENCY)
+        retry_budget (int): Chunk retries allowed in total (default TRANSCRIPTION_RETRY_BUDGET)
         
-        model = whisper.load_model("base")
-        result = model.transcribe(file_path)
-        transcription = result["text"].strip()
+    Returns:
+        list: Per-chunk results in chunk order, each {"index", "text", "segments", "error", "duration", "attempts"}
+            where segments are chunk-relative ASR timings, or None if the backend has none
+    """
+    max_concurrency = max(1, min(max_concurrency or TRANSCRIPTION_CONCURRENCY, len(chunks) or 1))
+    budget = TRANSCRIPTION_RETRY_BUDGET if retry_budget is None else retry_budget
+    
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="transcribe") as executor:
+        futures = [
+            executor.submit(_transcribe_chunk, i, len(chunks), chunk, max_tokens)
+            for i, chunk in enumerate(chunks)
+        ]
+        # Collect in submission order so the transcript keeps the song's order
+        results = [future.result() for future in futures]
         
-        if transcription and len(transcription) > 10:
-            print("✅ Local Whisper successful!", file=sys.stderr)
-            return transcription
-        else:
-            print("⚠️ Local Whisper returned empty/short result")
-            raise Exception("Empty transcription result")
+        for attempt in range(1, TRANSCRIPTION_MAX_RETRIES + 1):
+            retry = [result["index"] for result in results if _needs_retry(result)][:budget]
+            if not retry:
+                break
+            budget -= len(retry)
             
+            delay = TRANSCRIPTION_RETRY_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            print(f"🔁 Retrying chunks {[i + 1 for i in retry]} in {delay:.1f}s "
+                  f"({budget} retries left)", file=sys.stderr)
+            report("chunk_retry", chunks=[i + 1 for i in retry], attempt=attempt,
+                   delay=round(delay, 2), budget_left=budget)
+            time.sleep(delay)
+            
+            futures = {
+                i: executor.submit(_transcribe_chunk, i, len(chunks), chunks[i], max_tokens, attempt)
+                for i in retry
+            }
+            for i, future in futures.items():
+                results[i] = future.result()
+    
+    failed = [result["index"] + 1 for result in results if _needs_retry(result)]
+    if failed:
+        print(f"⚠️ {len(failed)}/{len(results)} chunks failed: {failed}", file=sys.stderr)
+    return results
+
+def _audio_payload(file_path=None, audio=None, sample_rate=None):
+    """
+    Base64 data and format for an audio request, from a file or an in-memory array.
+    Sends compact 16 kHz mono speech audio, falling back to the raw audio if encoding fails.
+    """
+    try:
+        return prepare_speech_payload(audio=audio, sample_rate=sample_rate, file_path=file_path)
+    except Exception as e:
+        print(f"⚠️ Compact payload encoding failed ({e}), sending raw audio", file=sys.stderr)
+    if audio is not None:
+        return base64.b64encode(encode_wav_bytes(audio, sample_rate)).decode("utf-8"), "wav"
+    return encode_audio(file_path), file_path.split(".")[-1].lower()
+
+def _validated(transcription, backend):
+    """Raise if a backend returned an empty or trivially short transcript."""
+    if not transcription or len(transcription) <= 10:
+        raise ValueError(f"{backend} returned an empty/short result")
+    return transcription
+
+def _transcribe_remote(model, system_prompt, max_completion_tokens, file_path=None, audio=None, sample_rate=None):
+    """Transcribe with a Boson AI audio model. Raises on failure or an empty result."""
+    audio_b64, fmt = _audio_payload(file_path, audio, sample_rate)
+
+    # Transcription at temperature 0 is deterministic, so identical audio is answered from the cache
+    response = cached_chat_completion(
+        get_client(),
+        accept=lambda content: len(content.strip()) > 10,
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": [
+                {
+                    "type": "input_audio",
+                    "input_audio": {"data": audio_b64, "format": fmt}
+                }
+            ]},
+        ],
+        max_completion_tokens=max_completion_tokens,
+        temperature=0.0,
+        timeout=TRANSCRIPTION_REQUEST_TIMEOUT,
+    )
+
+    transcription = _validated(response.choices[0].message.content.strip(), model)
+    return clean_transcription_output(transcription), None
+
+def _transcribe_higgs(file_path=None, audio=None, sample_rate=None):
+    """Method 1: Higgs Audio Understanding."""
+    return _transcribe_remote("higgs-audio-understanding-Hackathon", HIGGS_TRANSCRIPTION_PROMPT, 8192,
+                              file_path, audio, sample_rate)
+
+def _transcribe_whisper(file_path=None, audio=None, sample_rate=None):
+    """Method 2: Whisper via Boson AI."""
+    return _transcribe_remote("whisper-1", WHISPER_TRANSCRIPTION_PROMPT, 4096,
+                              file_path, audio, sample_rate)
+
+def _transcribe_local(file_path=None, audio=None, sample_rate=None):
+    """
+    Method 3: the resident local Whisper model.
+    Returns (text, segments) with one text line per recognized segment.
+    """
+    asr = get_local_asr()
+    # Whisper takes 16 kHz mono float32 arrays directly
+    source = to_speech_audio(audio, sample_rate) if audio is not None else file_path
+    result = asr.transcribe(source, word_timestamps=LOCAL_ASR_WORD_TIMESTAMPS)
+    segments = [s for s in result["segments"] if s["text"]]
+    transcription = "\n".join(s["text"] for s in segments) or result["text"]
+    return _validated(transcription, f"Local Whisper ({asr.backend})"), segments
+
+# (label, function) in fallback order
+TRANSCRIPTION_BACKENDS = [
+    ("Higgs Audio Understanding", _transcribe_higgs),
+    ("Whisper via Boson AI", _transcribe_whisper),
+    ("local Whisper", _transcribe_local),
+]
+
+def _transcription_backends():
+    if LOCAL_ASR_PRIMARY:
+        # On CPU nodes with faster-whisper installed the local model can beat the API round trip
+        return TRANSCRIPTION_BACKENDS[2:] + TRANSCRIPTION_BACKENDS[:2]
+    return TRANSCRIPTION_BACKENDS
+
+def _run_backend(label, backend, kwargs):
+    try:
+        return backend(**kwargs)
     except ImportError:
-        print("⚠️ Local Whisper not available (pip install openai-whisper)")
+        print(f"⚠️ {label} not available (pip install faster-whisper or openai-whisper)", file=sys.stderr)
     except Exception as e:
-        print(f"❌ Local Whisper failed: {e}", file=sys.stderr)
+        print(f"❌ {label} failed: {e}", file=sys.stderr)
+    return None
+
+def _get_hedge_pool():
+    """
+    The hedge thread pool and a semaphore with one slot per thread. Work is only
+    submitted after taking a slot, so it never queues behind losing requests.
+
+    Returns:
+        tuple: (ThreadPoolExecutor, BoundedSemaphore)
+    """
+    global _hedge_pool, _hedge_slots
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            workers = TRANSCRIPTION_HEDGE_THREADS or TRANSCRIPTION_CONCURRENCY * len(TRANSCRIPTION_BACKENDS)
+            _hedge_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge")
+            _hedge_slots = threading.BoundedSemaphore(workers)
+    return _hedge_pool, _hedge_slots
+
+def _run_hedged(slots, label, backend, kwargs):
+    try:
+        return _run_backend(label, backend, kwargs)
+    finally:
+        slots.release()
+
+def _transcribe_serial(backends, kwargs):
+    """Try each backend in turn until one succeeds."""
+    for i, (label, backend) in enumerate(backends):
+        print(f"📝 Method {i+1}: Trying {label}...", file=sys.stderr)
+        result = _run_backend(label, backend, kwargs)
+        if result:
+            print(f"✅ {label} successful!", file=sys.stderr)
+            return result
+    return None
+
+def _transcribe_hedged(backends, kwargs, delay):
+    """
+    Start the first backend, and start the next one whenever the running ones have
+    not produced a valid result within delay seconds (or all of them failed).
+    The first valid result wins; backends not started yet are cancelled and results
+    of ones still in flight are ignored.
+
+    A losing request cannot be aborted and keeps its thread until it answers or hits
+    TRANSCRIPTION_REQUEST_TIMEOUT. When losers hold every hedge thread, no extra
+    backend is started and the rest run one by one in the calling thread, so later
+    chunks degrade to the plain fallback order instead of queueing behind them.
+    """
+    pool, slots = _get_hedge_pool()
+    futures = {}
+    remaining = list(backends)
+    
+    def start_next():
+        if not slots.acquire(blocking=False):
+            return False
+        label, backend = remaining.pop(0)
+        print(f"📝 Starting {label} (hedged)...", file=sys.stderr)
+        futures[pool.submit(_run_hedged, slots, label, backend, kwargs)] = label
+        return True
+    
+    if not start_next():
+        print("⚠️ Hedge threads busy, transcribing without hedging", file=sys.stderr)
+        return _transcribe_serial(backends, kwargs)
+    started = time.perf_counter()
+    try:
+        while futures:
+            done, _ = wait(list(futures), timeout=delay if remaining else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                label = futures.pop(future)
+                result = future.result()
+                if result:
+                    elapsed = time.perf_counter() - started
+                    print(f"✅ {label} successful after {elapsed:.1f}s!", file=sys.stderr)
+                    report("transcription_hedge", winner=label, backends_started=len(backends) - len(remaining),
+                           seconds=round(elapsed, 3))
+                    return result
+            # Timed out, or everything in flight failed: bring in the next backend
+            if remaining and (not done or not futures) and not start_next() and not futures:
+                return _transcribe_serial(remaining, kwargs)
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
+
+def transcribe_audio(file_path: str = None, max_tokens=4096, audio=None, sample_rate=None, return_segments=False,
+                     hedge_delay=None):
+    """
+    Transcribe an audio file using multiple fallback methods.
+    Pass audio and sample_rate instead of file_path to transcribe an in-memory array.
+    With return_segments, returns (text, segments) where segments are the line and
+    word timings from local Whisper, or None when the backend gives no timestamps.
+    
+    With a hedge delay (default TRANSCRIPTION_HEDGE_DELAY) the methods race instead of
+    running strictly one after another: the next one starts when the previous ones
+    have not answered within the delay, so one slow backend cannot stall the chunk.
+    """
+    text, segments = _transcribe_audio(file_path, max_tokens, audio, sample_rate, hedge_delay)
+    return (text, segments) if return_segments else text
+
+def _transcribe_audio(file_path, max_tokens, audio, sample_rate, hedge_delay=None):
+    label = file_path or f"in-memory audio ({duration_of(audio, sample_rate):.1f}s)"
+    print(f"🎤 Transcribing audio: {label}", file=sys.stderr)
+    
+    kwargs = {"file_path": file_path, "audio": audio, "sample_rate": sample_rate}
+    hedge_delay = TRANSCRIPTION_HEDGE_DELAY if hedge_delay is None else hedge_delay
+    if hedge_delay > 0:
+        result = _transcribe_hedged(_transcription_backends(), kwargs, hedge_delay)
+    else:
+        result = _transcribe_serial(_transcription_backends(), kwargs)
+    if result:
+        return result
     
     # Method 4: Fallback - return a placeholder with file info
     print("📝 Method 4: Using fallback transcription...", file=sys.stderr)
-    duration = get_audio_duration(file_path)
-    fallback_text = f"[AUDIO TRANSCRIPTION NEEDED]\nFile: {os.path.basename(file_path)}\nDuration: {duration:.1f} seconds\n\nThis audio file needs manual transcription or the transcription service needs to be fixed.\n\nFor now, you can use this placeholder text for testing the translation pipeline."
+    if audio is not None:
+        duration = duration_of(audio, sample_rate)
+    else:
+        duration = get_audio_duration(file_path)
+    fallback_text = f"{FALLBACK_MARKER}\nFile: {os.path.basename(file_path or 'in-memory audio')}\nDuration: {duration:.1f} seconds\n\nThis audio file needs manual transcription or the transcription service needs to be fixed.\n\nFor now, you can use this placeholder text for testing the translation pipeline."
     
     print("⚠️ All transcription methods failed, using fallback", file=sys.stderr)
-    return fallback_text
+    return fallback_text, None
 
 def clean_transcription_output(text):
     """
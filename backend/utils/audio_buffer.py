@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+In-memory audio buffers
+Decodes a file once into a float32 array through an ffmpeg pipe and encodes arrays back to bytes
+"""
+
+import io
+import subprocess
+
+import numpy as np
+import soundfile as sf
+
+DEFAULT_SAMPLE_RATE = 44100
+DEFAULT_CHANNELS = 2
+
+
+def decode_audio(file_path, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS):
+    """
+    Decode any ffmpeg-readable file into a float32 buffer in a single pass.
+
+    Args:
+        file_path (str): Path to the audio file (mp3, wav, m4a, ...)
+        sample_rate (int): Output sample rate
+        channels (int): Output channel count
+
+    Returns:
+        tuple: (audio shaped (channels, samples), sample_rate)
+    """
+    result = subprocess.run([
+        "ffmpeg", "-v", "error", "-nostdin", "-i", str(file_path),
+        "-f", "f32le", "-acodec", "pcm_f32le",
+        "-ac", str(channels), "-ar", str(sample_rate),
+        "pipe:1"
+    ], capture_output=True, check=True)
+
+    audio = np.frombuffer(result.stdout, dtype="<f4")
+    audio = audio[:len(audio) - len(audio) % channels]
+    # Interleaved frames -> (channels, samples)
+    return audio.reshape(-1, channels).T.copy(), sample_rate
+
+
+def duration_of(audio, sample_rate):
+    """Duration in seconds of an array shaped (channels, samples) or (samples,)."""
+    return np.asarray(audio).shape[-1] / float(sample_rate)
+
+
+def to_mono(audio):
+    """Downmix (channels, samples) to (samples,)."""
+    audio = np.asarray(audio, dtype=np.float32)
+    return audio if audio.ndim == 1 else audio.mean(axis=0)
+
+
+def encode_wav_bytes(audio, sample_rate, subtype="PCM_16"):
+    """
+    Encode an array shaped (channels, samples) or (samples,) as WAV bytes in memory.
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    frames = audio if audio.ndim == 1 else audio.T
+    buffer = io.BytesIO()
+    sf.write(buffer, frames, sample_rate, format="WAV", subtype=subtype)
+    return buffer.getvalue()
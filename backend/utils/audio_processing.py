@@ -1,15 +1,25 @@
 import subprocess
 from pydub import AudioSegment
-import whisper
 import os
 import sys
+import time
 import numpy as np
 import soundfile as sf
+from progress import report, stage_timer
+from audio_buffer import decode_audio, duration_of
 
 # Paths
 INPUT_FILE = "backend/utils/sample1.mp3"
 OUTPUT_DIR = "output_stems"
 
+# "library" separates in-process with a resident Demucs model, "cli" always shells out to demucs
+SEPARATION_ENGINE = os.getenv("SEPARATION_ENGINE", "library")
+# "whole" separates the song in one pass, "segmented" splits it across a process pool (CPU nodes)
+SEPARATION_MODE = os.getenv("SEPARATION_MODE", "whole")
+
+# Engines selectable per request: full Demucs separation or the fast STFT preview separator
+SEPARATION_ENGINES = ("demucs", "fast")
+
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -23,7 +33,87 @@ def convert_mp3_to_wav(mp3_path):
     AudioSegment.from_mp3(mp3_path).export(wav_path, format="wav")
     return wav_path
 
-def separate_with_demucs(wav_path):
+def write_stems(base_name, vocals, accompaniment, sample_rate, output_dir=OUTPUT_DIR):
+    """
+    Write separated stems (arrays shaped (channels, samples)) to the final output directory.
+    Returns paths: (vocals_path, accompaniment_path)
+    """
+    final_output_dir = os.path.join(output_dir, "final")
+    os.makedirs(final_output_dir, exist_ok=True)
+    
+    vocals_path = os.path.join(final_output_dir, f"{base_name}_vocals.wav")
+    accompaniment_path = os.path.join(final_output_dir, f"{base_name}_background.wav")
+    
+    sf.write(vocals_path, np.asarray(vocals).T, sample_rate)
+    sf.write(accompaniment_path, np.asarray(accompaniment).T, sample_rate)
+    
+    print(f"Vocals saved to: {vocals_path}", file=sys.stderr)
+    print(f"Background music saved to: {accompaniment_path}", file=sys.stderr)
+    return vocals_path, accompaniment_path
+
+def separate_array(audio, sample_rate, engine="demucs"):
+    """
+    Separates an in-memory array shaped (channels, samples) with the chosen engine:
+    the resident Demucs model of this process, or the fast center channel separator.
+    Returns arrays: (vocals, accompaniment, sample_rate)
+    """
+    if engine not in SEPARATION_ENGINES:
+        raise ValueError(f"Unknown separation engine: {engine}")
+    
+    if engine == "fast":
+        from fast_separation import separate_center_channel
+        print("Separating audio with the fast center channel separator", file=sys.stderr)
+        return separate_center_channel(audio, sample_rate)
+    
+    from separation_engine import get_engine, separate_segmented
+    
+    model = get_engine()
+    print(f"Separating audio in-process with Demucs model {model.model_name} ({SEPARATION_MODE})", file=sys.stderr)
+    
+    attempt_start = time.perf_counter()
+    if SEPARATION_MODE == "segmented":
+        separated = separate_segmented(audio, sample_rate, model.model_name)
+    else:
+        separated = model.separate(audio, sample_rate)
+    report("demucs_attempt", model=model.model_name, engine="library", mode=SEPARATION_MODE,
+           status="ok", duration=round(time.perf_counter() - attempt_start, 3))
+    return separated
+
+def separate_in_process(wav_path, output_dir=OUTPUT_DIR):
+    """
+    Separates vocals and accompaniment with the resident Demucs model of this process.
+    Returns paths: (vocals_path, accompaniment_path)
+    """
+    audio, sample_rate = sf.read(wav_path, dtype="float32", always_2d=True)
+    vocals, accompaniment, stem_rate = separate_array(audio.T, sample_rate, "demucs")
+    
+    base_name = os.path.splitext(os.path.basename(wav_path))[0]
+    return write_stems(base_name, vocals, accompaniment, stem_rate, output_dir)
+
+def separate_fast(wav_path, output_dir=OUTPUT_DIR):
+    """
+    Separates vocals and accompaniment with the fast STFT center channel separator.
+    Much faster than Demucs but coarser: meant for previews and as a fallback.
+    Returns paths: (vocals_path, accompaniment_path)
+    """
+    audio, sample_rate = sf.read(wav_path, dtype="float32", always_2d=True)
+    vocals, accompaniment, stem_rate = separate_array(audio.T, sample_rate, "fast")
+    
+    base_name = os.path.splitext(os.path.basename(wav_path))[0]
+    return write_stems(base_name, vocals, accompaniment, stem_rate, output_dir)
+
+def separate_audio(wav_path, output_dir=OUTPUT_DIR, engine="demucs"):
+    """
+    Separates vocals and accompaniment with the chosen engine ("demucs" or "fast").
+    Returns paths: (vocals_path, accompaniment_path)
+    """
+    if engine not in SEPARATION_ENGINES:
+        raise ValueError(f"Unknown separation engine: {engine}")
+    if engine == "fast":
+        return separate_fast(wav_path, output_dir)
+    return separate_with_demucs(wav_path, output_dir)
+
+def separate_with_demucs(wav_path, output_dir=OUTPUT_DIR):
     """
     Separates vocals and accompaniment using Demucs.
     Returns paths: (vocals_path, accompaniment_path)
@@ -31,10 +121,17 @@ def separate_with_demucs(wav_path):
     if not os.path.exists(wav_path):
         raise FileNotFoundError(f"WAV file not found: {wav_path}")
     
+    if SEPARATION_ENGINE == "library":
+        try:
+            return separate_in_process(wav_path, output_dir)
+        except Exception as e:
+            print(f"In-process Demucs failed: {e}, falling back to the demucs CLI", file=sys.stderr)
+            report("demucs_attempt", engine="library", status="error", error=str(e))
+    
     print(f"Separating audio with Demucs: {wav_path}", file=sys.stderr)
     
     # Create a temporary directory for Demucs output
-    temp_output_dir = os.path.join(OUTPUT_DIR, "temp")
+    temp_output_dir = os.path.join(output_dir, "temp")
     os.makedirs(temp_output_dir, exist_ok=True)
     
     try:
@@ -43,6 +140,7 @@ def separate_with_demucs(wav_path):
         
         for model_name in models_to_try:
             print(f"Trying Demucs model: {model_name}", file=sys.stderr)
+            attempt_start = time.perf_counter()
             try:
                 result = subprocess.run([
                     "demucs",
@@ -54,10 +152,14 @@ def separate_with_demucs(wav_path):
                 ], check=True, capture_output=True, text=True, timeout=30)
                 
                 print(f"Demucs processing completed successfully with {model_name}", file=sys.stderr)
+                report("demucs_attempt", model=model_name, status="ok",
+                       duration=round(time.perf_counter() - attempt_start, 3))
                 break
                 
             except subprocess.CalledProcessError as e:
                 print(f"Demucs error with {model_name}: {e}", file=sys.stderr)
+                report("demucs_attempt", model=model_name, status="error",
+                       duration=round(time.perf_counter() - attempt_start, 3))
                 if "torchcodec" in str(e.stderr).lower():
                     print(f"TorchCodec issue with {model_name}, trying next model...", file=sys.stderr)
                     continue
@@ -65,16 +167,22 @@ def separate_with_demucs(wav_path):
                     raise e
             except subprocess.TimeoutExpired:
                 print(f"Timeout with {model_name}, trying next model...", file=sys.stderr)
+                report("demucs_attempt", model=model_name, status="timeout",
+                       duration=round(time.perf_counter() - attempt_start, 3))
                 continue
         
     except Exception as e:
         print(f"All Demucs models failed: {e}", file=sys.stderr)
         print("Demucs files not found, trying alternative approach...", file=sys.stderr)
         try:
-            return separate_with_alternative_method(wav_path)
+            return separate_with_alternative_method(wav_path, output_dir)
         except Exception as e2:
             print(f"Alternative method also failed: {e2}", file=sys.stderr)
-            return fallback_no_separation(wav_path)
+            try:
+                return separate_fast(wav_path, output_dir)
+            except Exception as e3:
+                print(f"Fast separation also failed: {e3}", file=sys.stderr)
+            return fallback_no_separation(wav_path, output_dir)
         
     # Check for Demucs output files in different model directories
     base_name = os.path.splitext(os.path.basename(wav_path))[0]
@@ -96,10 +204,10 @@ def separate_with_demucs(wav_path):
     # Check if files exist, if not, try alternative approach
     if not vocals_path or not accompaniment_path or not os.path.exists(vocals_path) or not os.path.exists(accompaniment_path):
         print("Demucs files not found, trying alternative approach...", file=sys.stderr)
-        return separate_with_alternative_method(wav_path)
+        return separate_with_alternative_method(wav_path, output_dir)
     
     # Move files to final output directory
-    final_output_dir = os.path.join(OUTPUT_DIR, "final")
+    final_output_dir = os.path.join(output_dir, "final")
     os.makedirs(final_output_dir, exist_ok=True)
     
     final_vocals_path = os.path.join(final_output_dir, f"{base_name}_vocals.wav")
@@ -114,7 +222,7 @@ def separate_with_demucs(wav_path):
     
     return final_vocals_path, final_accompaniment_path
 
-def fallback_no_separation(wav_path):
+def fallback_no_separation(wav_path, output_dir=OUTPUT_DIR):
     """
     Fallback method: if all separation methods fail, just copy the original file
     as both vocals and background. This allows transcription to proceed.
@@ -122,7 +230,7 @@ def fallback_no_separation(wav_path):
     print("Using fallback: copying original file as both vocals and background", file=sys.stderr)
     
     base_name = os.path.splitext(os.path.basename(wav_path))[0]
-    final_output_dir = os.path.join(OUTPUT_DIR, "final")
+    final_output_dir = os.path.join(output_dir, "final")
     os.makedirs(final_output_dir, exist_ok=True)
     
     vocals_path = os.path.join(final_output_dir, f"{base_name}_vocals.wav")
@@ -137,14 +245,14 @@ def fallback_no_separation(wav_path):
     
     return vocals_path, background_path
 
-def separate_with_alternative_method(wav_path):
+def separate_with_alternative_method(wav_path, output_dir=OUTPUT_DIR):
     """
     Try to use Demucs with different output formats to avoid TorchCodec issues.
     """
     print("Trying Demucs with different output formats...", file=sys.stderr)
     
     base_name = os.path.splitext(os.path.basename(wav_path))[0]
-    final_output_dir = os.path.join(OUTPUT_DIR, "final")
+    final_output_dir = os.path.join(output_dir, "final")
     os.makedirs(final_output_dir, exist_ok=True)
     
     vocals_path = os.path.join(final_output_dir, f"{base_name}_vocals.wav")
@@ -156,18 +264,18 @@ def separate_with_alternative_method(wav_path):
         {
             "name": "Demucs with MP3 output",
             "cmd": ["demucs", "-n", "htdemucs", "--two-stems=vocals", "--device", "cpu", 
-                   "--mp3", wav_path, "-o", OUTPUT_DIR]
+                   "--mp3", wav_path, "-o", output_dir]
         },
         # Try with different model and format
         {
             "name": "Demucs mdx_extra with MP3",
             "cmd": ["demucs", "-n", "mdx_extra", "--two-stems=vocals", "--device", "cpu",
-                   "--mp3", wav_path, "-o", OUTPUT_DIR]
+                   "--mp3", wav_path, "-o", output_dir]
         },
         # Try without two-stems (full separation)
         {
             "name": "Demucs full separation",
-            "cmd": ["demucs", "-n", "htdemucs", "--device", "cpu", wav_path, "-o", OUTPUT_DIR]
+            "cmd": ["demucs", "-n", "htdemucs", "--device", "cpu", wav_path, "-o", output_dir]
         }
     ]
     
@@ -180,12 +288,12 @@ def separate_with_alternative_method(wav_path):
             # Look for output files
             if "--mp3" in approach["cmd"]:
                 # Look for MP3 files
-                vocals_file = os.path.join(OUTPUT_DIR, "htdemucs", base_name, "vocals.mp3")
-                accompaniment_file = os.path.join(OUTPUT_DIR, "htdemucs", base_name, "no_vocals.mp3")
+                vocals_file = os.path.join(output_dir, "htdemucs", base_name, "vocals.mp3")
+                accompaniment_file = os.path.join(output_dir, "htdemucs", base_name, "no_vocals.mp3")
                 
                 if not os.path.exists(vocals_file):
-                    vocals_file = os.path.join(OUTPUT_DIR, "mdx_extra", base_name, "vocals.mp3")
-                    accompaniment_file = os.path.join(OUTPUT_DIR, "mdx_extra", base_name, "no_vocals.mp3")
+                    vocals_file = os.path.join(output_dir, "mdx_extra", base_name, "vocals.mp3")
+                    accompaniment_file = os.path.join(output_dir, "mdx_extra", base_name, "no_vocals.mp3")
                 
                 if os.path.exists(vocals_file) and os.path.exists(accompaniment_file):
                     # Convert MP3 to WAV
@@ -198,8 +306,8 @@ def separate_with_alternative_method(wav_path):
             
             else:
                 # Look for WAV files
-                vocals_file = os.path.join(OUTPUT_DIR, "htdemucs", base_name, "vocals.wav")
-                accompaniment_file = os.path.join(OUTPUT_DIR, "htdemucs", base_name, "no_vocals.wav")
+                vocals_file = os.path.join(output_dir, "htdemucs", base_name, "vocals.wav")
+                accompaniment_file = os.path.join(output_dir, "htdemucs", base_name, "no_vocals.wav")
                 
                 if os.path.exists(vocals_file) and os.path.exists(accompaniment_file):
                     subprocess.run(["cp", vocals_file, vocals_path], check=True)
@@ -216,27 +324,10 @@ def separate_with_alternative_method(wav_path):
             print(f"Timeout: {approach['name']}", file=sys.stderr)
             continue
     
-    # If all Demucs approaches fail, try a simple center channel extraction
+    # If all Demucs approaches fail, use the fast STFT center channel separator
     print("All Demucs approaches failed, trying center channel extraction...", file=sys.stderr)
     try:
-        # Convert to stereo and try center channel extraction (simple but sometimes effective)
-        subprocess.run([
-            "ffmpeg", "-i", wav_path, 
-            "-af", "pan=mono|c0=0.5*c0+0.5*c1",  # Center channel
-            vocals_path, "-y"
-        ], check=True)
-        
-        subprocess.run([
-            "ffmpeg", "-i", wav_path,
-            "-af", "pan=mono|c0=0.5*c0-0.5*c1",  # Side channel
-            accompaniment_path, "-y"
-        ], check=True)
-        
-        print(f"Center channel extraction completed", file=sys.stderr)
-        print(f"Vocals saved to: {vocals_path}", file=sys.stderr)
-        print(f"Background music saved to: {accompaniment_path}", file=sys.stderr)
-        return vocals_path, accompaniment_path
-        
+        return separate_fast(wav_path, output_dir)
     except Exception as e:
         print(f"Center channel extraction failed: {e}", file=sys.stderr)
     
@@ -251,47 +342,96 @@ def separate_with_alternative_method(wav_path):
     
     return vocals_path, accompaniment_path
 
-def transcribe_vocals(vocals_path):
-    """Transcribe vocals using multiple methods with fallbacks."""
-    if not os.path.exists(vocals_path):
+def transcribe_vocals(vocals_path, audio=None, sample_rate=None, return_segments=False):
+    """
+    Transcribe vocals using multiple methods with fallbacks.
+    When the decoded vocals are passed as audio/sample_rate they are chunked in memory.
+    With return_segments, returns (transcription, segments) where segments is the
+    lyric timeline ({"start", "end", "text", "words"} per line).
+    """
+    if audio is None and not os.path.exists(vocals_path):
         raise FileNotFoundError(f"Vocals file not found: {vocals_path}")
     
     print(f"Transcribing vocals: {vocals_path}", file=sys.stderr)
     
-    # Try the robust transcription method
+    transcription, segments = "TRANSCRIPTION_FAILED", []
+    # Try the robust transcription method; failed chunks are retried individually
     try:
-        from audio import transcribe_long_audio, manual_transcribe_for_testing
-        transcription = transcribe_long_audio(vocals_path, max_tokens=4096, max_chunk_duration=90)
+        from audio import FALLBACK_MARKER, transcribe_long_audio
+        transcription, segments = transcribe_long_audio(vocals_path, max_tokens=4096, max_chunk_duration=90,
+                                                        audio=audio, sample_rate=sample_rate, return_segments=True)
         
-        # If transcription failed or is too short, try again without fallback
-        if not transcription or len(transcription) < 20 or "TRANSCRIPTION NEEDED" in transcription:
-            print("⚠️ Transcription failed, trying again...")
-            # Try one more time with different parameters
-            transcription = transcribe_long_audio(vocals_path, max_tokens=8192, max_chunk_duration=60)
-            
-            if not transcription or len(transcription) < 20:
-                print("❌ Transcription failed completely")
-                return "TRANSCRIPTION_FAILED"
-        
-        return transcription
+        if not transcription or len(transcription) < 20 or FALLBACK_MARKER in transcription:
+            print("❌ Transcription failed completely")
+            transcription, segments = "TRANSCRIPTION_FAILED", []
         
     except Exception as e:
         print(f"All transcription methods failed: {e}")
         print("❌ Transcription failed completely")
-        return "TRANSCRIPTION_FAILED"
+        transcription, segments = "TRANSCRIPTION_FAILED", []
+    
+    return (transcription, segments) if return_segments else transcription
+
+def process_song(mp3_path, output_dir=OUTPUT_DIR, separation_engine="demucs", return_segments=False):
+    """
+    Process a song: decode, separate (with "demucs" or the "fast" preview engine), and transcribe.
+    The input is decoded once and the stems stay in memory for transcription; only the
+    final stems are written to disk. Uses the file-based pipeline when SEPARATION_ENGINE=cli
+    asks for the demucs CLI, and falls back to it if the in-memory path is unavailable
+    (e.g. Demucs library not installed).
+    With return_segments, the lyric timeline from transcription is returned as a fourth value.
+    """
+    if not os.path.exists(mp3_path):
+        raise FileNotFoundError(f"Input file not found: {mp3_path}")
+    
+    if separation_engine == "demucs" and SEPARATION_ENGINE == "cli":
+        # The in-memory path runs the Demucs library; SEPARATION_ENGINE=cli asks for the CLI
+        return process_song_from_files(mp3_path, output_dir, separation_engine, return_segments)
+    
+    try:
+        with stage_timer("decode") as info:
+            audio, sample_rate = decode_audio(mp3_path)
+            info["seconds"] = round(duration_of(audio, sample_rate), 2)
+        
+        with stage_timer("separation", engine=separation_engine):
+            vocals, accompaniment, stem_rate = separate_array(audio, sample_rate, separation_engine)
+        del audio
+    except Exception as e:
+        print(f"In-memory processing unavailable ({e}), using file-based pipeline", file=sys.stderr)
+        return process_song_from_files(mp3_path, output_dir, separation_engine, return_segments)
+    
+    base_name = os.path.splitext(os.path.basename(mp3_path))[0]
+    vocals_path, accompaniment_path = write_stems(base_name, vocals, accompaniment, stem_rate, output_dir)
+    
+    with stage_timer("transcription") as info:
+        transcription, segments = transcribe_vocals(vocals_path, audio=vocals, sample_rate=stem_rate,
+                                                    return_segments=True)
+        info["chars"] = len(transcription)
+        info["lines"] = len(segments)
+    
+    if return_segments:
+        return vocals_path, accompaniment_path, transcription, segments
+    return vocals_path, accompaniment_path, transcription
 
-def process_song(mp3_path):
-    """Process a song: convert, separate, and transcribe."""
+def process_song_from_files(mp3_path, output_dir=OUTPUT_DIR, separation_engine="demucs", return_segments=False):
+    """Process a song through intermediate files: convert to WAV, separate, and transcribe."""
     try:
         # Convert MP3 to WAV to avoid TorchCodec issues
-        wav_path = convert_mp3_to_wav(mp3_path)
+        with stage_timer("conversion"):
+            wav_path = convert_mp3_to_wav(mp3_path)
 
         # Separate stems
-        vocals_path, accompaniment_path = separate_with_demucs(wav_path)
+        with stage_timer("separation", engine=separation_engine):
+            vocals_path, accompaniment_path = separate_audio(wav_path, output_dir, separation_engine)
 
         # Transcribe vocals
-        transcription = transcribe_vocals(vocals_path)
+        with stage_timer("transcription") as info:
+            transcription, segments = transcribe_vocals(vocals_path, return_segments=True)
+            info["chars"] = len(transcription)
+            info["lines"] = len(segments)
 
+        if return_segments:
+            return vocals_path, accompaniment_path, transcription, segments
         return vocals_path, accompaniment_path, transcription
         
     except Exception as e:
@@ -1,14 +1,96 @@
-from openai import OpenAI
+"""
+Shared Boson AI clients
+One pooled sync and async client per process, with HTTP keep-alive and explicit timeouts
+"""
+
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
+import httpx
 import os
-import requests
 import sys
+import threading
 
 # Load .env from the project root, even if script runs from a subfolder
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../../.env"))
 print("Loading .env from:", os.path.join(os.path.dirname(__file__), "../../.env"), file=sys.stderr)
 
-client = OpenAI(
-    api_key="bai-983X8jWnN1Acm57MI3t-d4BqmxkDX_DxMyNAJQBJyB9WEyZ8",
-    base_url="https://hackathon.boson.ai/v1"
-)
+# Imported after .env is loaded, since the limiter reads its settings at import
+from rate_limiter import RateLimitedClient
+
+BOSON_BASE_URL = os.getenv("BOSON_BASE_URL", "https://hackathon.boson.ai/v1")
+
+# Connection pool: concurrent chunk transcriptions and translations share these connections
+MAX_CONNECTIONS = int(os.getenv("BOSON_MAX_CONNECTIONS", "32"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("BOSON_MAX_KEEPALIVE", "16"))
+KEEPALIVE_EXPIRY = float(os.getenv("BOSON_KEEPALIVE_EXPIRY", "60"))
+# Thinking models and long audio can take minutes to answer, but connecting should be quick
+CONNECT_TIMEOUT = float(os.getenv("BOSON_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("BOSON_READ_TIMEOUT", "300"))
+MAX_RETRIES = int(os.getenv("BOSON_MAX_RETRIES", "2"))
+# Route sync calls through the shared adaptive limiter, which then owns retries
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout():
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def _api_key():
+    """
+    Read the API key when a client is created, not at import: scripts load their own
+    .env or set os.environ after importing this module.
+    """
+    return os.getenv("BOSON_API_KEY") or os.getenv("OPENAI_API_KEY")
+
+
+def _get(kind, factory):
+    if not _api_key():
+        raise ValueError("BOSON_API_KEY environment variable not set (add it to the environment or the project .env)")
+    # Keyed by pid: a forked worker must not reuse its parent's sockets
+    key = (kind, os.getpid())
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+    return client
+
+
+def _sync_client():
+    client = OpenAI(
+        api_key=_api_key(),
+        base_url=BOSON_BASE_URL,
+        max_retries=0 if RATE_LIMIT_ENABLED else MAX_RETRIES,
+        http_client=httpx.Client(limits=_limits(), timeout=_timeout()),
+    )
+    return RateLimitedClient(client) if RATE_LIMIT_ENABLED else client
+
+
+def get_client():
+    """
+    Get the process-wide pooled Boson AI client. Chat completions are rate limited
+    per model and retried on 429/5xx (see rate_limiter) unless RATE_LIMIT_ENABLED=false.
+    """
+    return _get("sync", _sync_client)
+
+
+def get_async_client():
+    """Get the process-wide pooled async Boson AI client, for use from the event loop."""
+    return _get("async", lambda: AsyncOpenAI(
+        api_key=_api_key(),
+        base_url=BOSON_BASE_URL,
+        max_retries=MAX_RETRIES,
+        http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout()),
+    ))
+
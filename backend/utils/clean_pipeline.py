@@ -12,8 +12,15 @@ Voice generation modules have been removed as they are not working reliably.
 
 import os
 import sys
+import time
 from audio_processing import process_song
 from song_translator import SongTranslator, detect_language, get_supported_languages
+from result_cache import cache_key, get_result_cache
+from upload_store import file_sha256
+from translation_fanout import translate_languages
+
+# Ask for every target language in one model call; languages the answer misses are translated separately
+BATCH_TRANSLATION = os.getenv("TRANSLATION_BATCH", "false").lower() in ("1", "true", "yes")
 
 def main():
     """Main pipeline function - only working modules."""
@@ -58,22 +65,42 @@ def main():
     sys.path.append(os.path.dirname(__file__))
     from two_step_lyrics_processor import process_transcription_with_two_steps
     
+    def translate_two_steps(text, language):
+        return process_transcription_with_two_steps(text, language, source_language=source_language)
+    
+    print(f"🌍 Translating to {', '.join(TARGET_LANGUAGES)}...")
+    if BATCH_TRANSLATION:
+        # One call for all languages; the two-step system covers any language it gets wrong
+        start = time.perf_counter()
+        batch = SongTranslator().translate_song_batch(
+            transcription, TARGET_LANGUAGES, source_language, fallback=translate_two_steps)
+        duration = time.perf_counter() - start
+        results = {}
+        for target_lang, translation in batch.items():
+            failed = not translation or translation.startswith("Translation failed")
+            results[target_lang] = {
+                "translation": None if failed else translation,
+                "error": (translation.removeprefix("Translation failed: ") if translation else "Empty translation")
+                         if failed else None,
+                "duration": duration,
+            }
+    else:
+        # All languages are translated concurrently (two-step system for clean translations)
+        results = translate_languages(transcription, TARGET_LANGUAGES, translate_two_steps)
+    
     translations = {}
-    for target_lang in TARGET_LANGUAGES:
-        print(f"\n🌍 Translating to {target_lang}...")
-        try:
-            # Use two-step system for clean translations
-            translation = process_transcription_with_two_steps(transcription, target_lang)
-            if translation:
-                translations[target_lang] = translation
-                print(f"✅ {target_lang} translation completed!")
-                print(f"   Preview: {translation[:100]}...")
-            else:
-                print(f"❌ {target_lang} translation failed")
-                translations[target_lang] = f"Translation failed"
-        except Exception as e:
-            print(f"❌ {target_lang} translation failed: {e}")
-            translations[target_lang] = f"Translation failed: {str(e)}"
+    for target_lang, result in results.items():
+        translation = result["translation"]
+        if translation:
+            translations[target_lang] = translation
+            print(f"✅ {target_lang} translation completed in {result['duration']:.1f}s!")
+            print(f"   Preview: {translation[:100]}...")
+        elif result["error"] == "Empty translation":
+            print(f"❌ {target_lang} translation failed")
+            translations[target_lang] = f"Translation failed"
+        else:
+            print(f"❌ {target_lang} translation failed: {result['error']}")
+            translations[target_lang] = f"Translation failed: {result['error']}"
     
     # Step 4: Save results to organized directories
     print("\n💾 Step 4: Saving results...")
@@ -224,6 +251,20 @@ def process_single_song(audio_file, target_language, source_language=None):
     print(f"🎵 Processing: {audio_file}")
     print(f"🌍 Target language: {target_language}")
     
+    # Reuse the stored result if this audio was already processed with the same settings
+    translator = SongTranslator()
+    cache = get_result_cache()
+    key = cache_key(
+        file_sha256(audio_file), "single_song",
+        translation_model=translator.model,
+        target_language=target_language,
+        source_language=source_language,
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        print(f"♻️ Using cached result for {audio_file}")
+        return cached
+    
     # Process audio
     vocals_path, background_path, transcription = process_song(audio_file)
     
@@ -233,7 +274,6 @@ def process_single_song(audio_file, target_language, source_language=None):
         print(f"🔍 Detected source language: {source_language}")
     
     # Translate
-    translator = SongTranslator()
     translation = translator.translate_song(transcription, target_language, source_language)
     
     result = {
@@ -245,6 +285,10 @@ def process_single_song(audio_file, target_language, source_language=None):
         "target_language": target_language
     }
     
+    # Failed transcriptions and translations are not cached so they are retried next time
+    if transcription != "TRANSCRIPTION_FAILED" and not translation.startswith("Translation failed"):
+        result = cache.put(key, result, artifacts=[vocals_path, background_path])
+    
     return result
 
 if __name__ == "__main__":
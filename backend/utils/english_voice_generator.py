@@ -8,7 +8,7 @@ import os
 import sys
 import base64
 import subprocess
-from openai import OpenAI
+from boson_client import get_client
 from dotenv import load_dotenv
 
 # Add utils directory to path
@@ -17,14 +17,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'backend', 'utils'))
 class EnglishVoiceGenerator:
     def __init__(self):
         """Initialize the English voice generator."""
-        self.BOSON_API_KEY = os.getenv("BOSON_API_KEY")
-        if not self.BOSON_API_KEY:
-            raise ValueError("BOSON_API_KEY environment variable not set")
-        
-        self.client = OpenAI(
-            api_key=self.BOSON_API_KEY, 
-            base_url="https://hackathon.boson.ai/v1"
-        )
+        self.client = get_client()
         self.model = "higgs-audio-generation-Hackathon"
     
     def b64(self, path):
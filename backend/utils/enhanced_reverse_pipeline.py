@@ -16,6 +16,8 @@ from audio_processing import process_song
 from audio import transcribe_long_audio
 from reverse_song_translator import ReverseSongTranslator
 from english_voice_generator import EnglishVoiceGenerator
+from result_cache import cache_key, get_result_cache
+from upload_store import file_sha256
 
 def enhanced_reverse_translate_song(input_audio_path, output_dir="enhanced_reverse_results"):
     """
@@ -30,6 +32,30 @@ def enhanced_reverse_translate_song(input_audio_path, output_dir="enhanced_rever
     print(f"📁 Input: {input_audio_path}")
     print(f"📁 Output directory: {output_dir}")
     
+    # Reuse the stored result if this song was already translated
+    cache = get_result_cache()
+    key = cache_key(
+        file_sha256(input_audio_path), "enhanced_reverse",
+        translation_model="Qwen3-32B-thinking-Hackathon",
+        voice_model="higgs-audio-generation-Hackathon",
+        target_language="English",
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        # Copy the cached files to where a fresh run would put them
+        song_name = os.path.splitext(os.path.basename(input_audio_path))[0]
+        restored = cache.restore(cached, {
+            "vocals_path": f"{output_dir}/audio_separation/{song_name}_vocals.wav",
+            "background_path": f"{output_dir}/audio_separation/{song_name}_background.wav",
+            "transcription_file": f"{output_dir}/transcriptions/foreign_transcription.txt",
+            "translation_file": f"{output_dir}/translations/english_translation.txt",
+            "english_voice_path": f"{output_dir}/generated_voices/english_voice.wav",
+            "final_mix_path": f"{output_dir}/final_mixes/final_song_with_english_voice.wav",
+        })
+        if restored is not None:
+            print(f"♻️ Using cached result for {input_audio_path}")
+            return restored
+    
     # Create output directories
     os.makedirs(output_dir, exist_ok=True)
     os.makedirs(f"{output_dir}/audio_separation", exist_ok=True)
@@ -144,7 +170,7 @@ def enhanced_reverse_translate_song(input_audio_path, output_dir="enhanced_rever
     print(f"🇺🇸 English voice: {english_voice_path}")
     print(f"🎼 Final mix: {final_mix_path}")
     
-    return {
+    result = {
         "vocals_path": vocals_path,
         "background_path": background_path,
         "transcription_file": transcription_file,
@@ -152,6 +178,8 @@ def enhanced_reverse_translate_song(input_audio_path, output_dir="enhanced_rever
         "english_voice_path": english_voice_path,
         "final_mix_path": final_mix_path
     }
+    
+    return cache.put(key, result, artifacts=list(result.values()))
 
 def mix_audio_tracks(background_path, voice_path, output_path):
     """
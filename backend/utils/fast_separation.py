@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Fast STFT center-channel separator
+Vectorized NumPy/SciPy mid/side separation with spectral masking, for previews and when Demucs is unavailable
+"""
+
+import numpy as np
+from scipy.signal import stft, istft
+from scipy.ndimage import uniform_filter1d
+
+N_FFT = 2048
+HOP_LENGTH = 512
+
+# Frequency band where lead vocals live; bins outside it go to the background
+VOCAL_BAND_HZ = (120.0, 8000.0)
+
+
+def _stft(x, sample_rate, n_fft, hop_length):
+    _, _, spec = stft(x, fs=sample_rate, nperseg=n_fft, noverlap=n_fft - hop_length, boundary="even")
+    return spec
+
+
+def _istft(spec, sample_rate, n_fft, hop_length, length):
+    _, x = istft(spec, fs=sample_rate, nperseg=n_fft, noverlap=n_fft - hop_length, boundary=True)
+    out = np.zeros(length, dtype=np.float32)
+    n = min(length, x.shape[-1])
+    out[:n] = x[:n]
+    return out
+
+
+def separate_center_channel(audio, sample_rate, n_fft=N_FFT, hop_length=HOP_LENGTH,
+                            mask_power=2.0, smoothing_frames=5):
+    """
+    Separate center-panned vocals from a stereo mix.
+
+    Each time-frequency bin is weighted by how centered it is: the inter-channel
+    coherence 2|L·R*| / (|L|² + |R|²) is 1 for a source panned dead center (where
+    lead vocals usually sit) and drops towards 0 for side-panned instruments. The
+    mask is smoothed over time, limited to the vocal band and applied to the mid
+    channel; the background is the mix minus the extracted vocals.
+
+    Mono input has no stereo image, so the mask reduces to the vocal band filter.
+
+    Args:
+        audio (np.ndarray): Audio shaped (channels, samples) or (samples,)
+        sample_rate (int): Sample rate of the audio
+        n_fft (int): STFT window size
+        hop_length (int): STFT hop size
+        mask_power (float): Exponent sharpening the coherence mask
+        smoothing_frames (int): Frames the mask is averaged over, to reduce musical noise
+
+    Returns:
+        tuple: (vocals, no_vocals, sample_rate) with float32 arrays shaped (channels, samples)
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim == 1:
+        audio = audio[None, :]
+    if audio.shape[0] == 1:
+        left = right = audio[0]
+    else:
+        left, right = audio[0], audio[1]
+    length = audio.shape[1]
+
+    spec_l = _stft(left, sample_rate, n_fft, hop_length)
+    spec_r = _stft(right, sample_rate, n_fft, hop_length)
+    mid = 0.5 * (spec_l + spec_r)
+
+    cross = np.abs(spec_l * np.conj(spec_r))
+    power = np.abs(spec_l) ** 2 + np.abs(spec_r) ** 2
+    coherence = 2.0 * cross / np.maximum(power, 1e-12)
+    mask = coherence ** mask_power
+    if smoothing_frames > 1:
+        mask = uniform_filter1d(mask, size=smoothing_frames, axis=-1, mode="nearest")
+
+    freqs = np.fft.rfftfreq(n_fft, d=1.0 / sample_rate)
+    band = (freqs >= VOCAL_BAND_HZ[0]) & (freqs <= VOCAL_BAND_HZ[1])
+    mask *= band[:, None]
+
+    vocals_mono = _istft(mask * mid, sample_rate, n_fft, hop_length, length)
+
+    vocals = np.repeat(vocals_mono[None, :], audio.shape[0], axis=0)
+    no_vocals = audio - vocals
+    return vocals.astype(np.float32), no_vocals.astype(np.float32), sample_rate
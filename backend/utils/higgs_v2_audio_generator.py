@@ -6,7 +6,7 @@ This module implements voice cloning and generation using Higgs Audio V2.
 
 import os
 import base64
-from openai import OpenAI
+from boson_client import get_client
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,14 +15,7 @@ load_dotenv()
 class HiggsV2AudioGenerator:
     def __init__(self):
         """Initialize the Higgs V2 Audio Generator."""
-        self.BOSON_API_KEY = os.getenv("BOSON_API_KEY")
-        if not self.BOSON_API_KEY:
-            raise ValueError("BOSON_API_KEY environment variable not set")
-        
-        self.client = OpenAI(
-            api_key=self.BOSON_API_KEY, 
-            base_url="https://hackathon.boson.ai/v1"
-        )
+        self.client = get_client()
         self.model = "higgs-audio-generation-Hackathon"
         
         # System prompt for voice generation
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Background job queue for long-running audio processing
+Runs pipeline jobs in a bounded pool of worker processes so the API stays responsive
+"""
+
+import os
+import sys
+import uuid
+import time
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Job states reported by JobQueue.get()
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+DEFAULT_MAX_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+DEFAULT_MAX_PENDING = 32
+# Finished jobs are kept for polling this long, and at most this many of them
+DEFAULT_RESULT_TTL = 3600
+DEFAULT_MAX_FINISHED = 256
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds the maximum number of unfinished jobs."""
+
+
+class JobQueue:
+    """
+    Runs jobs in a ProcessPoolExecutor and keeps their status and results in memory.
+    Finished jobs are forgotten after a TTL, oldest first once there are too many.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, initializer=None, initargs=(),
+                 result_ttl=None, max_finished=None, on_evict=None):
+        """
+        Args:
+            max_workers (int): Number of worker processes (env JOB_WORKERS, default half the cores)
+            max_pending (int): Maximum unfinished jobs before submit() is refused (env JOB_MAX_PENDING)
+            result_ttl (float): Seconds a finished job stays available (env JOB_RESULT_TTL)
+            max_finished (int): Maximum finished jobs kept (env JOB_MAX_FINISHED)
+            initializer (callable): Optional function run once in every worker process
+            initargs (tuple): Arguments for the initializer
+            on_evict (callable): Optional on_evict(job_id), called when a finished job is
+                forgotten so files kept for it can be removed
+        """
+        self.max_workers = max_workers or int(os.getenv("JOB_WORKERS", DEFAULT_MAX_WORKERS))
+        self.max_pending = max_pending or int(os.getenv("JOB_MAX_PENDING", DEFAULT_MAX_PENDING))
+        self.result_ttl = result_ttl or float(os.getenv("JOB_RESULT_TTL", DEFAULT_RESULT_TTL))
+        self.max_finished = max_finished or int(os.getenv("JOB_MAX_FINISHED", DEFAULT_MAX_FINISHED))
+        self._initializer = initializer
+        self._initargs = initargs
+        self._on_evict = on_evict
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """Create the worker pool on first use so importing the API does not fork workers."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=self._initializer,
+                initargs=self._initargs,
+            )
+        return self._executor
+
+    def _prune(self):
+        """
+        Drop expired finished jobs, then the oldest ones beyond max_finished. Call with the
+        lock held, then pass the returned job IDs to _evicted() once it is released.
+        """
+        cutoff = time.time() - self.result_ttl
+        finished = sorted(
+            (job["finished_at"], job_id) for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None
+        )
+        excess = len(finished) - self.max_finished
+        dropped = []
+        for i, (finished_at, job_id) in enumerate(finished):
+            if finished_at >= cutoff and i >= excess:
+                break
+            del self._jobs[job_id]
+            dropped.append(job_id)
+        return dropped
+
+    def _evicted(self, job_ids):
+        if self._on_evict is None:
+            return
+        for job_id in job_ids:
+            try:
+                self._on_evict(job_id)
+            except Exception as e:
+                print(f"⚠️ Cleanup for job {job_id} failed: {e}", file=sys.stderr)
+
+    def _replace_broken_executor(self):
+        """
+        Drop a pool broken by a dead worker. Jobs it still held are failed with the
+        pool's error, so pollers see them finish instead of waiting forever.
+        """
+        broken, self._executor = self._executor, None
+        print("⚠️ Worker pool broken, restarting it", file=sys.stderr)
+        error = BrokenProcessPool("A worker process terminated abruptly while the job was pending")
+        with self._lock:
+            jobs = [(job_id, job) for job_id, job in self._jobs.items() if not job["future"].done()]
+        for job_id, job in jobs:
+            future = job["future"]
+            if not future.done():
+                try:
+                    future.set_exception(error)
+                except Exception:
+                    pass  # Finished in the meantime
+            self._mark_finished(job_id)
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    def pending_count(self):
+        """Number of jobs that are queued or running."""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job["future"].done())
+
+    def new_job_id(self):
+        """Generate an ID to pass to submit(), for callers that need it before queueing."""
+        return uuid.uuid4().hex
+
+    def submit(self, fn, *args, job_id=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) for a worker process.
+
+        Args:
+            fn (callable): Module-level (picklable) function to run
+            *args, **kwargs: Arguments passed to fn
+            job_id (str): Optional ID from new_job_id()
+
+        Returns:
+            str: Job ID
+        """
+        if self.pending_count() >= self.max_pending:
+            raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+
+        job_id = job_id or self.new_job_id()
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, crash in native code); start a fresh pool
+            self._replace_broken_executor()
+            future = self._get_executor().submit(fn, *args, **kwargs)
+
+        with self._lock:
+            dropped = self._prune()
+            self._jobs[job_id] = {
+                "future": future,
+                "submitted_at": time.time(),
+                "finished_at": None,
+            }
+        self._evicted(dropped)
+
+        future.add_done_callback(lambda _: self._mark_finished(job_id))
+        print(f"Queued job {job_id}", file=sys.stderr)
+        return job_id
+
+    def add_completed(self, result):
+        """
+        Register a job that is already finished, e.g. a result cache hit.
+
+        Args:
+            result: The job result
+
+        Returns:
+            str: Job ID
+        """
+        job_id = self.new_job_id()
+        future = Future()
+        future.set_result(result)
+        now = time.time()
+
+        with self._lock:
+            dropped = self._prune()
+            self._jobs[job_id] = {
+                "future": future,
+                "submitted_at": now,
+                "finished_at": now,
+            }
+        self._evicted(dropped)
+        return job_id
+
+    def _mark_finished(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["finished_at"] = time.time()
+
+    def get(self, job_id):
+        """
+        Get the status of a job.
+
+        Args:
+            job_id (str): Job ID returned by submit()
+
+        Returns:
+            dict: Job status, result and error, or None if the job is unknown
+        """
+        with self._lock:
+            dropped = self._prune()
+            job = self._jobs.get(job_id)
+        self._evicted(dropped)
+        if job is None:
+            return None
+
+        future = job["future"]
+        status = {
+            "job_id": job_id,
+            "status": JOB_QUEUED,
+            "submitted_at": job["submitted_at"],
+            "finished_at": job["finished_at"],
+            "result": None,
+            "error": None,
+        }
+
+        if future.running():
+            status["status"] = JOB_RUNNING
+        elif future.done():
+            error = future.exception()
+            if error is not None:
+                status["status"] = JOB_FAILED
+                status["error"] = str(error)
+            else:
+                status["status"] = JOB_COMPLETED
+                status["result"] = future.result()
+
+        return status
+
+    def shutdown(self, wait=True):
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Karaoke processing pipeline used by the FastAPI job workers
+Separation -> transcription -> translation -> timed lyrics for one uploaded song
+"""
+
+import os
+import sys
+import subprocess
+
+# Add utils to path
+sys.path.append(os.path.dirname(__file__))
+
+from audio_processing import process_song
+from reverse_song_translator import ReverseSongTranslator
+from result_cache import cache_key, get_result_cache
+from upload_store import file_sha256
+from progress import FileProgressReporter, report, set_reporter, stage_timer
+from lyrics_timeline import create_timed_lyrics, follow_timeline
+from lyrics_alignment import ALIGNMENT_SAMPLE_RATE, align_lyrics
+from audio_buffer import decode_audio
+
+# Models used by this pipeline, part of the result cache key
+TRANSCRIPTION_MODEL = "higgs-audio-understanding-Hackathon"
+TRANSLATION_MODEL = "Qwen3-32B-thinking-Hackathon"
+
+
+def get_audio_duration(file_path):
+    """Get audio duration using ffprobe"""
+    try:
+        result = subprocess.run([
+            'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1', str(file_path)
+        ], capture_output=True, text=True, check=True)
+        return float(result.stdout.strip())
+    except Exception:
+        return 0.0
+
+
+def translation_path(vocals_path, output_dir):
+    """Where the English translation of a song is saved: next to its stems, under the same base name."""
+    base_name = os.path.basename(str(vocals_path))
+    if base_name.endswith("_vocals.wav"):
+        base_name = base_name[:-len("_vocals.wav")]
+    else:
+        base_name = os.path.splitext(base_name)[0]
+    return os.path.join(os.path.dirname(str(vocals_path)) or str(output_dir), f"{base_name}_english_translation.txt")
+
+
+def align_timelines(transcription, translation, vocals, sample_rate, segments):
+    """
+    Align lyrics to the vocals stem: the translation against the original line timings,
+    and the original itself when its timings are only chunk-level estimates.
+
+    Returns:
+        tuple: (original segments, translated segments); either is None if it was not aligned
+    """
+    if vocals is None:
+        return segments, None
+
+    with stage_timer("alignment") as info:
+        if segments and any(segment.get("estimated") for segment in segments):
+            segments = align_lyrics(transcription, vocals, sample_rate, segments)
+        translated = align_lyrics(translation, vocals, sample_rate, segments) if translation else None
+        info["lines"] = len(translated or [])
+    return segments, translated
+
+
+def build_lyrics(transcription, duration, vocals_path, background_path, output_dir, segments=None):
+    """
+    Detect the language, translate to English and build the timed lyrics payload.
+    Line timings come from the transcription timeline (segments) when it is available,
+    refined against the vocals stem.
+
+    Returns:
+        dict: LyricsResponse fields, or None if there is no usable transcription
+    """
+    if not transcription or transcription == "TRANSCRIPTION_FAILED":
+        return None
+
+    lyrics = {
+        "audio_duration": duration,
+        "vocals_path": str(vocals_path),
+        "background_path": str(background_path),
+    }
+
+    # The vocals at a low rate, for language identification and lyric alignment
+    try:
+        vocals, sample_rate = decode_audio(vocals_path, sample_rate=ALIGNMENT_SAMPLE_RATE, channels=1)
+    except Exception as e:
+        print(f"Could not decode vocals for lyrics alignment: {e}", file=sys.stderr)
+        vocals, sample_rate = None, None
+
+    try:
+        # Detect language (locally when confident) and translate
+        translator = ReverseSongTranslator()
+        with stage_timer("language_detection") as info:
+            detected_language = translator.detect_language(transcription, vocals, sample_rate)
+            info["language"] = detected_language
+
+        if detected_language and detected_language.lower() != "english":
+            # Translate to English
+            with stage_timer("translation", source_language=detected_language):
+                english_translation = translator.translate_to_english(transcription, detected_language)
+            if english_translation:
+                # Named after the song's stems, so concurrent jobs do not overwrite each other's file
+                with open(translation_path(vocals_path, output_dir), "w", encoding="utf-8") as f:
+                    f.write(english_translation)
+
+            try:
+                original_segments, translated_segments = align_timelines(
+                    transcription, english_translation, vocals, sample_rate, segments)
+            except Exception as e:
+                print(f"Lyrics alignment failed ({e}), using transcription timings", file=sys.stderr)
+                original_segments, translated_segments = segments, None
+
+            lyrics["original_lyrics"] = create_timed_lyrics(transcription, duration, original_segments)
+            if translated_segments:
+                lyrics["translated_lyrics"] = create_timed_lyrics(english_translation, duration, translated_segments)
+            else:
+                lyrics["translated_lyrics"] = follow_timeline(english_translation, duration, segments)
+        else:
+            # Already in English, create single language lyrics
+            try:
+                segments, _ = align_timelines(transcription, None, vocals, sample_rate, segments)
+            except Exception as e:
+                print(f"Lyrics alignment failed ({e}), using transcription timings", file=sys.stderr)
+            english_lyrics = create_timed_lyrics(transcription, duration, segments)
+            lyrics["original_lyrics"] = english_lyrics
+            lyrics["translated_lyrics"] = english_lyrics  # Same for English
+    except Exception as e:
+        print(f"Lyrics processing error: {e}", file=sys.stderr)
+        # Fallback: create basic lyrics without translation
+        basic_lyrics = create_timed_lyrics(transcription, duration, segments)
+        lyrics["original_lyrics"] = basic_lyrics
+        lyrics["translated_lyrics"] = basic_lyrics
+
+    return lyrics
+
+
+def karaoke_cache_key(file_hash, separation_engine="demucs"):
+    """Result cache key for a karaoke run over the audio with this content hash."""
+    return cache_key(
+        file_hash, "karaoke",
+        separation_engine=separation_engine,
+        transcription_model=TRANSCRIPTION_MODEL,
+        translation_model=TRANSLATION_MODEL,
+        target_language="English",
+    )
+
+
+def process_karaoke_song(file_path, output_dir, file_hash=None, events_path=None, separation_engine="demucs"):
+    """
+    Process an uploaded song for karaoke. Runs inside a job worker process.
+
+    Args:
+        file_path (str): Path to the uploaded audio file
+        output_dir (str): Directory for separated stems and translations
+        file_hash (str): SHA-256 of the file, computed if not given
+        events_path (str): JSON-lines file to write progress events to
+        separation_engine (str): "demucs", or "fast" for an instant preview
+
+    Returns:
+        dict: ProcessResponse fields
+    """
+    set_reporter(FileProgressReporter(events_path) if events_path else None)
+    report("job_started", file=os.path.basename(str(file_path)))
+    try:
+        result = _process_karaoke_song(file_path, output_dir, file_hash, separation_engine)
+        report("job_completed")
+        return result
+    except Exception as e:
+        report("job_failed", error=str(e))
+        raise
+    finally:
+        set_reporter(None)
+
+
+def _process_karaoke_song(file_path, output_dir, file_hash, separation_engine):
+    key = karaoke_cache_key(file_hash or file_sha256(file_path), separation_engine)
+    cache = get_result_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        report("cache_hit")
+        return cached
+
+    print(f"Processing audio file: {file_path}", file=sys.stderr)
+
+    # Process the song (separate vocals/background and transcribe)
+    vocals_path, background_path, transcription, segments = process_song(
+        str(file_path), str(output_dir), separation_engine, return_segments=True)
+
+    if not vocals_path or not background_path:
+        raise RuntimeError("Audio separation failed")
+
+    duration = get_audio_duration(file_path)
+    lyrics = build_lyrics(transcription, duration, vocals_path, background_path, str(output_dir), segments)
+
+    result = {
+        "success": True,
+        "message": "Audio processed successfully",
+        "vocals_path": str(vocals_path),
+        "background_path": str(background_path),
+        "lyrics": lyrics,
+    }
+
+    # Only cache runs that produced lyrics, so failed transcriptions are retried
+    if lyrics is not None:
+        result = cache.put(key, result, artifacts=[vocals_path, background_path])
+
+    return result
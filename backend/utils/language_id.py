@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Local spoken-language identification
+Names the language of a transcript (script and stopword profiles) or of the first 30 s of vocals (Whisper),
+with a confidence so callers only ask the LLM when unsure
+"""
+
+import os
+import re
+import sys
+from collections import Counter
+
+# Below this confidence the caller should escalate to the LLM
+LANGUAGE_ID_THRESHOLD = float(os.getenv("LANGUAGE_ID_THRESHOLD", "0.6"))
+# Audio-based identification listens to this much of the vocals
+AUDIO_ID_SECONDS = 30
+
+# Frequent function words per language, enough to tell them apart on a verse of lyrics
+STOPWORDS = {
+    "English": "the and you i to a of in my me is it that your on for be with we all love what don't i'm can it's this".split(),
+    "Spanish": "el la de que y en los las un una por con mi tu te me se no es para lo como más pero yo amor corazón".split(),
+    "French": "le la les de des et un une je tu il est pas que qui dans pour sur mon ma tes moi toi c'est j'ai avec".split(),
+    "German": "der die das und ich du nicht ist ein eine zu mit mein dich mich sich auf für es wir sie auch noch ja".split(),
+    "Italian": "il lo la di che e un una per non mi ti ci con sono io tu è nel della sei come ma più amore cuore".split(),
+    "Portuguese": "o a os as de que e um uma não eu você me te do da em para com meu minha é mais coração então".split(),
+    "Dutch": "de het een en ik je niet is dat van mijn op te zijn maar wat jij met voor ook nog wel mij".split(),
+    "Swedish": "och jag du det att en är på inte som för med mig dig har min vi kan om så ett var".split(),
+    "Polish": "i w nie się na że to jest z do ja ty mnie mi jak tak co ale czy już tylko jestem".split(),
+    "Turkish": "ve bir bu ben sen o ne için de da gibi çok var yok ama beni seni değil mi daha".split(),
+    "Indonesian": "dan yang di aku kau ini itu tak tidak ke dari dengan untuk kita cinta hati akan sudah".split(),
+}
+_STOPWORD_SETS = {language: set(words) for language, words in STOPWORDS.items()}
+
+# Letters that on their own point strongly at one Latin-script language
+DIACRITICS = {
+    "Spanish": "ñ¿¡",
+    "Portuguese": "ãõ",
+    "German": "ß",
+    "French": "œçèêë",
+    "Polish": "ąęłńśźż",
+    "Turkish": "ğış",
+    "Swedish": "å",
+}
+
+# Unicode ranges of non-Latin scripts and the language each usually means in song lyrics
+SCRIPTS = [
+    ("Korean", [(0xAC00, 0xD7AF), (0x1100, 0x11FF), (0x3130, 0x318F)]),
+    ("Kana", [(0x3040, 0x30FF)]),
+    ("Han", [(0x4E00, 0x9FFF), (0x3400, 0x4DBF)]),
+    ("Cyrillic", [(0x0400, 0x04FF)]),
+    ("Arabic", [(0x0600, 0x06FF)]),
+    ("Hebrew", [(0x0590, 0x05FF)]),
+    ("Greek", [(0x0370, 0x03FF)]),
+    ("Thai", [(0x0E00, 0x0E7F)]),
+    ("Hindi", [(0x0900, 0x097F)]),
+]
+
+# Whisper language codes for the languages the pipeline translates most
+WHISPER_LANGUAGES = {
+    "en": "English", "es": "Spanish", "fr": "French", "de": "German", "it": "Italian",
+    "pt": "Portuguese", "nl": "Dutch", "sv": "Swedish", "pl": "Polish", "tr": "Turkish",
+    "id": "Indonesian", "ru": "Russian", "uk": "Ukrainian", "ja": "Japanese", "ko": "Korean",
+    "zh": "Chinese", "ar": "Arabic", "he": "Hebrew", "el": "Greek", "th": "Thai", "hi": "Hindi",
+    "vi": "Vietnamese", "ro": "Romanian", "cs": "Czech", "hu": "Hungarian", "fi": "Finnish",
+    "da": "Danish", "no": "Norwegian", "bg": "Bulgarian", "sr": "Serbian", "hr": "Croatian",
+}
+
+# Answers the LLM fallback may give that are worth caching
+KNOWN_LANGUAGES = set(STOPWORDS) | set(WHISPER_LANGUAGES.values()) | {
+    "Malay", "Tagalog", "Belarusian", "Lithuanian", "Latvian", "Estonian", "Slovak", "Slovenian",
+    "Macedonian", "Albanian", "Maltese", "Catalan", "Persian", "Urdu", "Bengali", "Tamil", "Swahili",
+}
+
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+def _script_counts(text):
+    counts = Counter()
+    for char in text:
+        if not char.isalpha():
+            continue
+        code = ord(char)
+        for script, ranges in SCRIPTS:
+            if any(lo <= code <= hi for lo, hi in ranges):
+                counts[script] += 1
+                break
+        else:
+            counts["Latin"] += 1
+    return counts
+
+
+def _identify_script(counts, text):
+    """Language from a dominant non-Latin script, or None for Latin text."""
+    letters = sum(counts.values())
+    cjk = counts["Kana"] + counts["Han"]
+    if counts["Korean"] / letters > 0.3:
+        return "Korean", counts["Korean"] / letters
+    if cjk / letters > 0.3:
+        # Japanese mixes kana into Han text; Chinese has none
+        if counts["Kana"] > 0.1 * cjk:
+            return "Japanese", cjk / letters
+        return "Chinese", cjk / letters
+    if counts["Cyrillic"] / letters > 0.3:
+        if re.search("[іїєґ]", text.lower()):
+            return "Ukrainian", counts["Cyrillic"] / letters
+        # Russian is the usual case, but other Cyrillic languages exist, so leave room for the LLM
+        return "Russian", 0.8 * counts["Cyrillic"] / letters
+    for script in ("Arabic", "Hebrew", "Greek", "Thai", "Hindi"):
+        if counts[script] / letters > 0.3:
+            return script, counts[script] / letters
+    return None
+
+
+def identify_text_language(text):
+    """
+    Identify the language of a transcript without any model call.
+
+    Non-Latin scripts map to their language directly. Latin-script text is scored
+    against stopword profiles plus characteristic diacritics; confidence combines
+    the margin over the runner-up with how much evidence there is.
+
+    Returns:
+        tuple: (language name, confidence 0-1), ("Unknown", 0.0) when there is nothing to go on
+    """
+    text = text or ""
+    counts = _script_counts(text)
+    if not counts:
+        return "Unknown", 0.0
+
+    script = _identify_script(counts, text)
+    if script:
+        return script
+
+    lowered = text.lower()
+    tokens = _WORD.findall(lowered)
+    if not tokens:
+        return "Unknown", 0.0
+
+    scores = Counter()
+    for token in tokens:
+        for language, words in _STOPWORD_SETS.items():
+            if token in words:
+                scores[language] += 1
+    for language, letters in DIACRITICS.items():
+        hits = sum(lowered.count(letter) for letter in letters)
+        if hits:
+            scores[language] += 2 * hits
+
+    ranked = scores.most_common(2)
+    if not ranked or ranked[0][1] <= 0:
+        return "Unknown", 0.0
+    best_language, best = ranked[0]
+    second = ranked[1][1] if len(ranked) > 1 else 0
+    margin = (best - second) / best
+    evidence = min(1.0, best / 8.0)
+    return best_language, round(margin * evidence, 3)
+
+
+def identify_audio_language(audio, sample_rate):
+    """
+    Identify the sung language from the first AUDIO_ID_SECONDS of the vocals with the
+    resident local Whisper model.
+
+    Returns:
+        tuple: (language name, probability), ("Unknown", 0.0) if no local model is installed
+    """
+    try:
+        from local_asr import get_local_asr
+        from speech_payload import to_speech_audio
+
+        speech = to_speech_audio(audio[..., :int(AUDIO_ID_SECONDS * sample_rate)], sample_rate)
+        code, probability = get_local_asr().detect_language(speech)
+        return WHISPER_LANGUAGES.get(code, code or "Unknown"), float(probability or 0.0)
+    except ImportError:
+        return "Unknown", 0.0
+    except Exception as e:
+        print(f"⚠️ Audio language identification failed: {e}", file=sys.stderr)
+        return "Unknown", 0.0
+
+
+def identify_language(text=None, audio=None, sample_rate=None, threshold=None):
+    """
+    Identify a language from the transcript, then from the vocals if the text is not conclusive.
+
+    Returns:
+        tuple: (language name, confidence 0-1)
+    """
+    threshold = LANGUAGE_ID_THRESHOLD if threshold is None else threshold
+    language, confidence = identify_text_language(text) if text else ("Unknown", 0.0)
+    if confidence >= threshold or audio is None:
+        return language, confidence
+
+    audio_language, audio_confidence = identify_audio_language(audio, sample_rate)
+    if audio_language == language:
+        # Independent agreement
+        return language, 1.0 - (1.0 - confidence) * (1.0 - audio_confidence)
+    if audio_confidence > confidence:
+        return audio_language, audio_confidence
+    return language, confidence
+
+
+def is_language_name(answer):
+    """True if an LLM answer is just a known language name (not "Unknown" or free-form text)."""
+    return (answer or "").strip().strip(".\"'").title() in KNOWN_LANGUAGES
+
+
+def detect_language(text, llm_detect, audio=None, sample_rate=None, threshold=None):
+    """
+    Name the language locally, escalating to llm_detect(text) only when unsure.
+
+    Args:
+        text (str): Transcript or lyrics
+        llm_detect (callable): LLM-based detection used for low-confidence cases
+        audio (np.ndarray): Optional vocals, shaped (channels, samples) or (samples,)
+        sample_rate (int): Sample rate of audio
+        threshold (float): Minimum local confidence (default LANGUAGE_ID_THRESHOLD)
+
+    Returns:
+        str: Language name
+    """
+    threshold = LANGUAGE_ID_THRESHOLD if threshold is None else threshold
+    language, confidence = identify_language(text, audio, sample_rate, threshold)
+    if language != "Unknown" and confidence >= threshold:
+        print(f"✅ Detected language locally: {language} (confidence {confidence:.2f})")
+        return language
+
+    print(f"🔍 Local language ID unsure ({language}, {confidence:.2f}), asking the LLM...")
+    return llm_detect(text)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Persistent LLM response cache
+SQLite store of chat completion outputs for deterministic calls, with TTL and size-bounded LRU eviction
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+DEFAULT_CACHE_PATH = os.path.join("result_cache", "llm_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_MB = 256
+
+# Run eviction after this many inserts
+EVICT_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _normalize_content(content):
+    if isinstance(content, str):
+        return content.strip()
+    if isinstance(content, list):
+        return [_normalize_content(part) for part in content]
+    if isinstance(content, dict):
+        return {k: _normalize_content(v) for k, v in content.items()}
+    return content
+
+
+def request_key(model, messages, **params):
+    """
+    Key a chat completion request by model, normalized messages and sampling parameters.
+    Whitespace around message text does not change the key.
+    """
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": message["role"], "content": _normalize_content(message["content"])}
+            for message in messages
+        ],
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite cache of completion texts. Safe to share between threads (one connection
+    per thread) and between worker processes (WAL journal, busy timeout).
+    """
+
+    def __init__(self, path=None, ttl=None, max_bytes=None):
+        """
+        Args:
+            path (str): Database file (env LLM_CACHE_PATH)
+            ttl (float): Seconds an entry stays valid (env LLM_CACHE_TTL)
+            max_bytes (int): Size limit before LRU eviction (env LLM_CACHE_MAX_MB)
+        """
+        self.path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl = float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL_SECONDS)) if ttl is None else ttl
+        if max_bytes is None:
+            max_bytes = int(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._inserts = 0
+        self._inserts_lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            connection.commit()
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        """
+        Look up a cached completion and mark it as recently used.
+
+        Returns:
+            str: Cached content, or None on a miss or an expired entry
+        """
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT content, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        content, expires_at = row
+        if expires_at < now:
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            connection.commit()
+            return None
+        connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        connection.commit()
+        return content
+
+    def put(self, key, model, content, ttl=None):
+        """Store a completion text."""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, model, content, size, created_at, expires_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, model, content, len(content.encode("utf-8")), now, now + ttl, now),
+        )
+        connection.commit()
+
+        with self._inserts_lock:
+            self._inserts += 1
+            due = self._inserts % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under the size limit."""
+        connection = self._connection()
+        connection.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            doomed = []
+            for key, size in connection.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                if excess <= 0:
+                    break
+                doomed.append((key,))
+                excess -= size
+            connection.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            print(f"🧹 LLM cache evicted {len(doomed)} entries", file=sys.stderr)
+        connection.commit()
+
+
+def get_llm_cache():
+    """Get the process-wide LLM cache, or None when disabled with LLM_CACHE_ENABLED=false."""
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+    return _cache
+
+
+def _response(content):
+    """A minimal stand-in for a ChatCompletion, so call sites read hits and misses alike."""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], cached=True)
+
+
+def cached_chat_completion(client, ttl=None, accept=None, **request):
+    """
+    client.chat.completions.create(**request), served from the persistent cache when
+    the same request was answered before. Only use it for deterministic calls (low
+    temperature, no tools) where replaying an earlier answer is correct.
+
+    Args:
+        client: OpenAI-compatible client
+        ttl (float): Entry lifetime in seconds (default LLM_CACHE_TTL)
+        accept (callable): Predicate on the content; rejected answers are not cached
+            (default: any non-empty content)
+        **request: Arguments for chat.completions.create
+
+    Returns:
+        ChatCompletion, or an equivalent object with .choices[0].message.content on a hit
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return client.chat.completions.create(**request)
+
+    params = {k: v for k, v in request.items() if k not in ("model", "messages", "timeout")}
+    key = request_key(request["model"], request["messages"], **params)
+    try:
+        content = cache.get(key)
+    except sqlite3.Error as e:
+        print(f"⚠️ LLM cache unavailable: {e}", file=sys.stderr)
+        return client.chat.completions.create(**request)
+    if content is not None:
+        print(f"♻️ LLM cache hit: {request['model']} {key[:12]}", file=sys.stderr)
+        return _response(content)
+
+    response = client.chat.completions.create(**request)
+    content = response.choices[0].message.content
+    if content and (accept is None or accept(content)):
+        try:
+            cache.put(key, request["model"], content, ttl)
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not store LLM response: {e}", file=sys.stderr)
+    return response
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Resident local speech recognition engine
+Loads a Whisper model lazily once per process, with a faster-whisper (CTranslate2 int8) backend for CPU nodes
+"""
+
+import os
+import sys
+import threading
+
+# "auto" prefers faster-whisper and falls back to openai-whisper
+LOCAL_ASR_BACKEND = os.getenv("LOCAL_ASR_BACKEND", "auto")
+LOCAL_ASR_MODEL = os.getenv("LOCAL_ASR_MODEL", "base")
+# CTranslate2 compute type for faster-whisper: int8 is the fast choice on CPU
+LOCAL_ASR_COMPUTE_TYPE = os.getenv("LOCAL_ASR_COMPUTE_TYPE", "int8")
+LOCAL_ASR_DEVICE = os.getenv("LOCAL_ASR_DEVICE", "cpu")
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+class LocalASR:
+    """
+    A Whisper model that stays loaded for the life of the process.
+
+    Both backends return the openai-whisper result layout:
+    {"text", "language", "language_probability", "segments": [{"start", "end", "text", "words"}]}
+    """
+
+    def __init__(self, backend=LOCAL_ASR_BACKEND, model_name=LOCAL_ASR_MODEL,
+                 device=LOCAL_ASR_DEVICE, compute_type=LOCAL_ASR_COMPUTE_TYPE):
+        self.backend = backend
+        self.model_name = model_name
+        self.device = device
+        self.compute_type = compute_type
+        self.model = None
+        self._load_lock = threading.Lock()
+        # openai-whisper models are not safe to call from several threads at once
+        self._transcribe_lock = threading.Lock()
+
+    def load(self):
+        """Load the model on first use. Raises ImportError if no backend is installed."""
+        if self.model is not None:
+            return self.model
+
+        with self._load_lock:
+            if self.model is not None:
+                return self.model
+
+            if self.backend in ("auto", "faster-whisper"):
+                try:
+                    from faster_whisper import WhisperModel
+                    print(f"Loading faster-whisper {self.model_name} ({self.device}, {self.compute_type})", file=sys.stderr)
+                    self.model = WhisperModel(self.model_name, device=self.device, compute_type=self.compute_type)
+                    self.backend = "faster-whisper"
+                    return self.model
+                except ImportError:
+                    if self.backend == "faster-whisper":
+                        raise
+
+            import whisper
+            print(f"Loading openai-whisper {self.model_name} ({self.device})", file=sys.stderr)
+            self.model = whisper.load_model(self.model_name, device=self.device)
+            self.backend = "whisper"
+            return self.model
+
+    def transcribe(self, audio, language=None, word_timestamps=False):
+        """
+        Transcribe speech.
+
+        Args:
+            audio (np.ndarray | str): 16 kHz mono float32 samples, or a file path
+            language (str): Optional language code to skip language detection
+            word_timestamps (bool): Also return per-word timings
+
+        Returns:
+            dict: Transcription in the openai-whisper result layout
+        """
+        model = self.load()
+
+        if self.backend == "faster-whisper":
+            segments, info = model.transcribe(
+                audio, language=language, beam_size=1, word_timestamps=word_timestamps,
+                vad_filter=True,
+            )
+            result_segments = []
+            for segment in segments:
+                words = [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in (segment.words or [])
+                ]
+                result_segments.append({
+                    "start": segment.start, "end": segment.end,
+                    "text": segment.text.strip(), "words": words,
+                })
+            return {
+                "text": " ".join(s["text"] for s in result_segments),
+                "language": info.language,
+                "language_probability": info.language_probability,
+                "segments": result_segments,
+            }
+
+        with self._transcribe_lock:
+            result = model.transcribe(
+                audio, language=language, word_timestamps=word_timestamps,
+                fp16=self.device != "cpu",
+            )
+        segments = [
+            {
+                "start": s["start"], "end": s["end"], "text": s["text"].strip(),
+                "words": [
+                    {"word": w["word"], "start": w["start"], "end": w["end"], "probability": w.get("probability")}
+                    for w in s.get("words", [])
+                ],
+            }
+            for s in result.get("segments", [])
+        ]
+        return {
+            "text": result["text"].strip(),
+            "language": result.get("language"),
+            "language_probability": None,
+            "segments": segments,
+        }
+
+    def detect_language(self, audio):
+        """
+        Identify the spoken language from up to 30 s of 16 kHz mono audio.
+
+        Returns:
+            tuple: (whisper language code, probability)
+        """
+        model = self.load()
+
+        if self.backend == "faster-whisper":
+            # Language detection runs eagerly; the lazy segment generator is never consumed
+            _, info = model.transcribe(audio, beam_size=1)
+            return info.language, info.language_probability
+
+        import whisper
+        with self._transcribe_lock:
+            mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels).to(model.device)
+            _, probs = model.detect_language(mel)
+        language = max(probs, key=probs.get)
+        return language, probs[language]
+
+
+def get_local_asr():
+    """Get the process-wide LocalASR engine (the model itself loads on first transcribe)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = LocalASR()
+    return _engine
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Offline lyric alignment against the vocals stem
+Places lyric lines (e.g. a translation) on the sung phrases using the vocal energy envelope and DTW
+"""
+
+import numpy as np
+
+from audio_buffer import decode_audio, to_mono
+from lyrics_timeline import distribute_words
+
+ALIGNMENT_SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+
+# Frames this far below the loud parts of the vocals count as silence
+VOICED_RANGE_DB = 30.0
+# Pauses shorter than this do not split a phrase; blips shorter than MIN_PHRASE_SECONDS are noise
+MIN_GAP_SECONDS = 0.3
+MIN_PHRASE_SECONDS = 0.2
+# Line starts move to a vocal onset at most this far away
+SNAP_SECONDS = 0.6
+# Energy rise per frame (dB) that marks an onset inside a phrase
+ONSET_RISE_DB = 6.0
+
+
+def vocal_envelope(audio, sample_rate, frame_duration=FRAME_SECONDS, smoothing=0.06):
+    """
+    Frame energy of the vocals in dB, smoothed over a short window.
+
+    Returns:
+        np.ndarray: One value per frame_duration seconds
+    """
+    mono = to_mono(audio)
+    frame = max(1, int(frame_duration * sample_rate))
+    num_frames = len(mono) // frame
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    energy = np.square(mono[:num_frames * frame].reshape(num_frames, frame)).mean(axis=1)
+    width = max(1, int(smoothing / frame_duration))
+    energy = np.convolve(energy, np.ones(width) / width, mode="same")
+    return 10.0 * np.log10(energy + 1e-10)
+
+
+def voiced_phrases(envelope, frame_duration=FRAME_SECONDS):
+    """
+    Find sung phrases: runs of voiced frames, joined across short pauses.
+
+    Returns:
+        list: (start, end) in seconds per phrase
+    """
+    if len(envelope) == 0:
+        return []
+
+    loud = np.percentile(envelope, 95)
+    quiet = np.percentile(envelope, 10)
+    voiced = envelope > max(loud - VOICED_RANGE_DB, quiet + 6.0)
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    runs = list(zip(edges[0::2], edges[1::2]))
+
+    min_gap = int(MIN_GAP_SECONDS / frame_duration)
+    merged = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_length = int(MIN_PHRASE_SECONDS / frame_duration)
+    return [(start * frame_duration, end * frame_duration)
+            for start, end in merged if end - start >= min_length]
+
+
+def onset_times(envelope, phrases, frame_duration=FRAME_SECONDS):
+    """Phrase starts plus sharp energy rises inside phrases, in seconds, sorted."""
+    rise = np.diff(envelope, prepend=envelope[:1]) if len(envelope) else envelope
+    peaks = np.flatnonzero(
+        (rise > ONSET_RISE_DB)
+        & (rise >= np.roll(rise, 1))
+        & (rise >= np.roll(rise, -1))
+    ) * frame_duration
+    anchors = np.concatenate((np.array([start for start, _ in phrases]), peaks))
+    return np.unique(np.round(anchors, 2))
+
+
+def _relative_positions(texts):
+    """Midpoint of each line as a fraction of the total character count."""
+    lengths = np.array([max(len(text), 1) for text in texts], dtype=np.float64)
+    ends = np.cumsum(lengths)
+    return (ends - lengths / 2) / ends[-1]
+
+
+def match_lines(lines, reference_texts):
+    """
+    DTW between two lists of lyric lines, comparing where each line falls in its lyrics.
+
+    A translation often merges or splits lines; DTW maps every line to one or more
+    reference lines (and vice versa) while keeping both in order.
+
+    Returns:
+        list: (line index, reference index) pairs along the warping path
+    """
+    a = _relative_positions(lines)
+    b = _relative_positions(reference_texts)
+    cost = np.abs(a[:, None] - b[None, :])
+
+    n, m = cost.shape
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            acc[i, j] = cost[i - 1, j - 1] + min(acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1])
+
+    path = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        step = int(np.argmin((acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1])))
+        if step == 0:
+            i, j = i - 1, j - 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+    return path[::-1]
+
+
+def _spans_from_reference(lines, reference):
+    """Give each line the time of the reference lines DTW matched it to."""
+    path = match_lines(lines, [segment["text"] for segment in reference])
+
+    # A reference line shared by several lines is split between them by length
+    sharers = {}
+    for i, j in path:
+        sharers.setdefault(j, []).append(i)
+
+    spans = {}
+    for j, indices in sharers.items():
+        start, end = reference[j]["start"], reference[j]["end"]
+        weights = np.array([max(len(lines[i]), 1) for i in indices], dtype=np.float64)
+        bounds = start + (end - start) * np.concatenate(([0.0], np.cumsum(weights) / weights.sum()))
+        for k, i in enumerate(indices):
+            lo, hi = spans.get(i, (np.inf, -np.inf))
+            spans[i] = (min(lo, bounds[k]), max(hi, bounds[k + 1]))
+    return [spans[i] for i in range(len(lines))]
+
+
+def _spans_from_phrases(lines, phrases):
+    """Spread lines over the voiced time only, by length, skipping instrumental gaps."""
+    voiced = np.array([end - start for start, end in phrases])
+    knots_voiced = np.concatenate(([0.0], np.repeat(np.cumsum(voiced), 2)[:-1]))
+    knots_time = np.array([t for phrase in phrases for t in phrase])
+
+    lengths = np.array([max(len(line), 1) for line in lines], dtype=np.float64)
+    bounds = np.concatenate(([0.0], np.cumsum(lengths) / lengths.sum())) * voiced.sum()
+    # Nudge starts forward so a line beginning at a phrase junction starts at the next phrase
+    starts = np.interp(bounds[:-1] + 1e-6, knots_voiced, knots_time)
+    ends = np.interp(bounds[1:], knots_voiced, knots_time)
+    return list(zip(starts, ends))
+
+
+def align_lyrics(text, vocals, sample_rate, reference=None):
+    """
+    Time lyric lines against the vocals stem without any LLM or ASR call.
+
+    Lines are first placed on the reference timeline (the original lyrics' line
+    timings) by DTW, or spread over the detected voiced phrases when there is no
+    reference. Each line start then snaps to the nearest vocal onset.
+
+    Args:
+        text (str): Lyrics to align, one line per text line
+        vocals (np.ndarray): Vocals stem shaped (channels, samples) or (samples,)
+        sample_rate (int): Sample rate of vocals
+        reference (list): Timeline of the original lyrics, {"start", "end", "text"} per line
+
+    Returns:
+        list: Timeline segments {"start", "end", "text", "words"}, empty if there are no lines
+    """
+    lines = [line.strip() for line in (text or "").split("\n") if line.strip()]
+    reference = [segment for segment in reference or [] if segment["text"]]
+    if not lines:
+        return []
+
+    envelope = vocal_envelope(vocals, sample_rate)
+    phrases = voiced_phrases(envelope)
+
+    if reference:
+        spans = _spans_from_reference(lines, reference)
+    elif phrases:
+        spans = _spans_from_phrases(lines, phrases)
+    else:
+        return []
+
+    anchors = onset_times(envelope, phrases)
+    starts = np.array([start for start, _ in spans])
+    ends = np.array([end for _, end in spans])
+    if len(anchors):
+        nearest = np.clip(np.searchsorted(anchors, starts), 1, len(anchors)) - 1
+        candidates = np.stack((anchors[nearest], anchors[np.minimum(nearest + 1, len(anchors) - 1)]))
+        best = candidates[np.argmin(np.abs(candidates - starts), axis=0), np.arange(len(starts))]
+        starts = np.where(np.abs(best - starts) <= SNAP_SECONDS, best, starts)
+
+    # Keep lines in order and stop each one where the next begins
+    starts = np.maximum.accumulate(starts)
+    ends = np.minimum(ends, np.append(starts[1:], np.inf))
+    ends = np.maximum(ends, starts + FRAME_SECONDS)
+
+    return [
+        {"start": float(start), "end": float(end), "text": line,
+         "words": distribute_words(line, float(start), float(end))}
+        for line, start, end in zip(lines, starts, ends)
+    ]
+
+
+def align_to_vocals(text, vocals_path, reference=None):
+    """Decode the vocals stem at a low rate and align lyric lines to it (see align_lyrics)."""
+    vocals, sample_rate = decode_audio(vocals_path, sample_rate=ALIGNMENT_SAMPLE_RATE, channels=1)
+    return align_lyrics(text, vocals, sample_rate, reference)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Timed lyric lines for karaoke
+Builds line and word timestamps from ASR segments or transcribed chunk spans
+"""
+
+
+def _line_entry(text, start, end, words=None):
+    entry = {
+        "text": text,
+        "start": round(start, 2),
+        "end": round(end, 2),
+        "duration": round(end - start, 2),
+    }
+    if words:
+        entry["words"] = words
+    return entry
+
+
+def distribute_words(line, start, end):
+    """Spread the words of a line over its span, weighted by word length."""
+    words = line.split()
+    total = sum(len(w) for w in words) or 1
+    timed = []
+    t = start
+    for word in words:
+        word_end = t + (end - start) * len(word) / total
+        timed.append({"word": word, "start": round(t, 2), "end": round(word_end, 2)})
+        t = word_end
+    return timed
+
+
+def distribute_lines(text, start, end):
+    """
+    Time the lines of a transcript over a span without ASR timestamps.
+
+    Each line gets a share of the span proportional to its character count, which
+    tracks how long it takes to sing much better than an equal share per line.
+
+    Args:
+        text (str): Transcript, one lyric line per text line
+        start (float): Span start in seconds
+        end (float): Span end in seconds
+
+    Returns:
+        list: Timeline segments {"start", "end", "text", "words", "estimated"}
+    """
+    lines = [line.strip() for line in (text or "").split("\n") if line.strip()]
+    total = sum(len(line) for line in lines)
+    if not lines or end <= start:
+        return []
+
+    segments = []
+    t = start
+    for line in lines:
+        line_end = t + (end - start) * len(line) / total
+        segments.append({
+            "start": t, "end": line_end, "text": line,
+            "words": distribute_words(line, t, line_end),
+            "estimated": True,
+        })
+        t = line_end
+    return segments
+
+
+def offset_segments(segments, offset):
+    """Shift chunk-relative ASR segments (and their words) to song time."""
+    shifted = []
+    for segment in segments:
+        words = [
+            dict(word, start=word["start"] + offset, end=word["end"] + offset)
+            for word in segment.get("words") or []
+        ]
+        shifted.append(dict(segment, start=segment["start"] + offset,
+                            end=segment["end"] + offset, words=words))
+    return shifted
+
+
+def create_timed_lyrics(text: str, duration: float, segments: list = None) -> list:
+    """
+    Create synchronized lyrics with timestamps.
+
+    Uses the transcription timeline when it is available; otherwise the duration is
+    divided evenly across the lines.
+
+    Args:
+        text (str): Lyrics, one line per text line
+        duration (float): Song duration in seconds
+        segments (list): Timeline from transcription, {"start", "end", "text", "words"} per line
+
+    Returns:
+        list: {"text", "start", "end", "duration"} per line, plus "words" when known
+    """
+    if segments:
+        timed_lyrics = []
+        for segment in segments:
+            if not segment["text"]:
+                continue
+            words = [
+                {"word": w["word"].strip(), "start": round(w["start"], 2), "end": round(w["end"], 2)}
+                for w in segment.get("words") or []
+            ]
+            timed_lyrics.append(_line_entry(segment["text"], segment["start"], segment["end"], words))
+        return timed_lyrics
+
+    if not text or duration <= 0:
+        return []
+
+    # Split text into lines/phrases
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+    if not lines:
+        return []
+
+    # Calculate timing for each line
+    time_per_line = duration / len(lines)
+
+    return [
+        _line_entry(line, i * time_per_line, (i + 1) * time_per_line)
+        for i, line in enumerate(lines)
+    ]
+
+
+def follow_timeline(text: str, duration: float, segments: list = None) -> list:
+    """
+    Time a translation against the original lyric timeline.
+
+    When the translation has one line per original line, each line takes the
+    original's timing; otherwise the duration is divided evenly.
+    """
+    lines = [line.strip() for line in (text or "").split("\n") if line.strip()]
+    timed = [s for s in segments or [] if s["text"]]
+    if lines and len(lines) == len(timed):
+        return [_line_entry(line, s["start"], s["end"]) for line, s in zip(lines, timed)]
+    return create_timed_lyrics(text, duration)
@@ -13,6 +13,8 @@ from pathlib import Path
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend', 'utils'))
 
+from lyrics_timeline import create_timed_lyrics, follow_timeline
+
 def get_audio_duration(file_path):
     """Get audio duration using ffprobe"""
     try:
@@ -24,34 +26,6 @@ def get_audio_duration(file_path):
     except:
         return 0.0
 
-def create_timed_lyrics(text, duration):
-    """Create synchronized lyrics with timestamps"""
-    if not text or duration <= 0:
-        return []
-    
-    # Split text into lines/phrases
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    
-    if not lines:
-        return []
-    
-    # Calculate timing for each line
-    time_per_line = duration / len(lines)
-    
-    timed_lyrics = []
-    for i, line in enumerate(lines):
-        start_time = i * time_per_line
-        end_time = (i + 1) * time_per_line
-        
-        timed_lyrics.append({
-            "text": line,
-            "start": round(start_time, 2),
-            "end": round(end_time, 2),
-            "duration": round(time_per_line, 2)
-        })
-    
-    return timed_lyrics
-
 def detect_language_from_filename(filename):
     """Simple language detection based on filename"""
     filename_lower = filename.lower()
@@ -83,7 +57,8 @@ def process_audio_file(file_path):
         print(f"Processing: {file_path}")
         
         # Process the song (separate vocals/background and transcribe)
-        vocals_path, background_path, transcription = process_song(file_path, output_dir)
+        vocals_path, background_path, transcription, segments = process_song(
+            file_path, output_dir, return_segments=True)
         
         if not vocals_path or not background_path:
             raise Exception("Audio separation failed")
@@ -91,8 +66,15 @@ def process_audio_file(file_path):
         # Get audio duration
         duration = get_audio_duration(file_path)
         
-        # Detect language
-        detected_language = detect_language_from_filename(os.path.basename(file_path))
+        # Detect language from the lyrics (locally, asking the LLM only when unsure)
+        detected_language = None
+        if transcription and transcription != "TRANSCRIPTION_FAILED":
+            try:
+                detected_language = ReverseSongTranslator().detect_language(transcription)
+            except Exception as e:
+                print(f"⚠️ Language detection failed, guessing from the filename: {e}", file=sys.stderr)
+        if not detected_language:
+            detected_language = detect_language_from_filename(os.path.basename(file_path))
         
         # Create synchronized lyrics
         original_lyrics = []
@@ -103,23 +85,20 @@ def process_audio_file(file_path):
                 # Translate to English if not already English
                 if detected_language.lower() != 'english' and detected_language != 'Unknown':
                     translator = ReverseSongTranslator()
-                    english_translation = translator.translate_to_english(
-                        transcription, 
-                        os.path.join(output_dir, "english_translation.txt")
-                    )
+                    english_translation = translator.translate_to_english(transcription, detected_language)
                     
-                    original_lyrics = create_timed_lyrics(transcription, duration)
-                    translated_lyrics = create_timed_lyrics(english_translation, duration)
+                    original_lyrics = create_timed_lyrics(transcription, duration, segments)
+                    translated_lyrics = follow_timeline(english_translation, duration, segments)
                 else:
                     # Already in English
-                    english_lyrics = create_timed_lyrics(transcription, duration)
+                    english_lyrics = create_timed_lyrics(transcription, duration, segments)
                     original_lyrics = english_lyrics
                     translated_lyrics = english_lyrics
                     
             except Exception as e:
                 print(f"Translation error: {e}")
                 # Fallback: create basic lyrics
-                basic_lyrics = create_timed_lyrics(transcription, duration)
+                basic_lyrics = create_timed_lyrics(transcription, duration, segments)
                 original_lyrics = basic_lyrics
                 translated_lyrics = basic_lyrics
         
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Pipeline progress events
+Pipeline stages call report() and the active reporter records timed events for clients to stream
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+_reporter = None
+
+
+class FileProgressReporter:
+    """
+    Appends progress events as JSON lines to a file. Works across processes:
+    the job worker writes the file and the API process tails it.
+    """
+
+    def __init__(self, events_path):
+        self.events_path = str(events_path)
+        self.started_at = time.time()
+
+    def emit(self, stage, **fields):
+        now = time.time()
+        event = {
+            "stage": stage,
+            "timestamp": round(now, 3),
+            "elapsed": round(now - self.started_at, 3),
+        }
+        event.update(fields)
+        with open(self.events_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+
+
+def set_reporter(reporter):
+    """Install the reporter for this process (None disables reporting)."""
+    global _reporter
+    _reporter = reporter
+
+
+def report(stage, **fields):
+    """
+    Report a pipeline event. A no-op when no reporter is installed, so pipeline
+    modules can call it unconditionally.
+
+    Args:
+        stage (str): Event name, e.g. "conversion_done" or "chunk_transcribed"
+        **fields: Extra JSON-serializable event data (timings, model names, counts)
+    """
+    if _reporter is None:
+        return
+    try:
+        _reporter.emit(stage, **fields)
+    except Exception as e:
+        print(f"⚠️ Could not report progress event {stage}: {e}", file=sys.stderr)
+
+
+@contextmanager
+def stage_timer(stage, **fields):
+    """
+    Time a block and report "<stage>_done" with its duration, or "<stage>_failed" on error.
+    Yields a dict the block can add fields to.
+    """
+    extra = {}
+    start = time.perf_counter()
+    try:
+        yield extra
+    except Exception as e:
+        report(f"{stage}_failed", duration=round(time.perf_counter() - start, 3),
+               error=str(e), **fields, **extra)
+        raise
+    report(f"{stage}_done", duration=round(time.perf_counter() - start, 3), **fields, **extra)
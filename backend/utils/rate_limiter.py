@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Adaptive rate limiting for Boson AI calls
+One limiter per model: a token bucket for request rate, AIMD concurrency on 429/5xx, jittered retries honouring Retry-After
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+import openai
+
+from progress import report
+
+# Requests per second and burst per model; "model=rps" pairs override the default
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "4"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "8"))
+RATE_LIMIT_RPS_OVERRIDES = os.getenv("RATE_LIMIT_RPS_OVERRIDES", "")
+# Concurrency starts at the maximum, halves on overload and grows back by about one per round of successes
+RATE_LIMIT_MAX_CONCURRENCY = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "16"))
+RATE_LIMIT_MIN_CONCURRENCY = 1
+# Retries of 429/503 answers, with full-jitter exponential backoff or the server's Retry-After
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+# No retry starts later than this many seconds after the first attempt, so callers keep bounded latency
+RATE_LIMIT_RETRY_WINDOW = float(os.getenv("RATE_LIMIT_RETRY_WINDOW", "60"))
+RATE_LIMIT_BACKOFF = float(os.getenv("RATE_LIMIT_BACKOFF", "1"))
+RATE_LIMIT_MAX_BACKOFF = float(os.getenv("RATE_LIMIT_MAX_BACKOFF", "30"))
+# Overload signals within this window count as one, so a burst of failures halves concurrency once
+DECREASE_COOLDOWN = 1.0
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _rate_for(model):
+    for pair in RATE_LIMIT_RPS_OVERRIDES.split(","):
+        name, _, rps = pair.partition("=")
+        if name.strip() == model and rps.strip():
+            return float(rps)
+    return RATE_LIMIT_RPS
+
+
+def retry_after_seconds(error):
+    """Seconds the server asked us to wait (Retry-After / retry-after-ms headers), or None."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error):
+    """
+    Decide how a failed request affects the limiter.
+
+    Only 429 and 503 are retried: the server answered quickly and asked us to slow
+    down. Timeouts and other failures are raised at once, since the caller (chunk
+    hedging, retry budgets, backend fallbacks) has its own latency bound.
+
+    Returns:
+        tuple: (retryable, overloaded) - overloaded errors (429, 5xx, timeouts) shrink concurrency
+    """
+    if isinstance(error, openai.APITimeoutError):
+        return False, True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (429, 503), error.status_code == 429 or error.status_code >= 500
+    return False, False
+
+
+class AdaptiveLimiter:
+    """
+    Gate for the requests to one model, shared by every thread in the process.
+
+    A request waits until the token bucket has a token, fewer than the current
+    concurrency limit are in flight, and no Retry-After pause is active.
+    """
+
+    def __init__(self, model, rate=None, burst=None, max_concurrency=None):
+        """
+        Args:
+            model (str): Model name, for logs and progress events
+            rate (float): Requests per second, 0 for no rate limit (default RATE_LIMIT_RPS)
+            burst (float): Bucket size (default RATE_LIMIT_BURST)
+            max_concurrency (int): Concurrency ceiling (default RATE_LIMIT_MAX_CONCURRENCY)
+        """
+        self.model = model
+        self.rate = _rate_for(model) if rate is None else rate
+        self.burst = max(1.0, RATE_LIMIT_BURST if burst is None else burst)
+        self.max_concurrency = max_concurrency or RATE_LIMIT_MAX_CONCURRENCY
+        self.concurrency = float(self.max_concurrency)
+        self.in_flight = 0
+        self.tokens = self.burst
+        self.refilled_at = time.monotonic()
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.in_flight >= max(RATE_LIMIT_MIN_CONCURRENCY, int(self.concurrency)):
+                    wait = None
+                elif now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.rate > 0 and self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    if self.rate > 0:
+                        self.tokens -= 1
+                    self.in_flight += 1
+                    return
+                self._condition.wait(wait)
+
+    def release(self, outcome="success", retry_after=None):
+        """
+        Finish a request and adapt the concurrency limit.
+
+        Args:
+            outcome (str): "success" (additive increase), "overloaded" (multiplicative
+                decrease) or "error" (no change)
+            retry_after (float): Pause every request to this model for this long
+        """
+        with self._condition:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if outcome == "success":
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            elif outcome == "overloaded" and now - self.decreased_at >= DECREASE_COOLDOWN:
+                self.concurrency = max(RATE_LIMIT_MIN_CONCURRENCY, self.concurrency / 2)
+                self.decreased_at = now
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            self._condition.notify_all()
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) under the limiter, retrying 429/503 answers with jittered
+        exponential backoff (or the server's Retry-After) within RATE_LIMIT_RETRY_WINDOW.
+        """
+        started = time.monotonic()
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                retryable, overloaded = classify_error(e)
+                retry_after = retry_after_seconds(e) if retryable else None
+                self.release("overloaded" if overloaded else "error", retry_after)
+                if not retryable or attempt == RATE_LIMIT_MAX_RETRIES:
+                    raise
+                if retry_after is not None:
+                    delay = retry_after
+                else:
+                    delay = random.uniform(0, min(RATE_LIMIT_MAX_BACKOFF, RATE_LIMIT_BACKOFF * 2 ** attempt))
+                if time.monotonic() - started + delay > RATE_LIMIT_RETRY_WINDOW:
+                    raise
+                print(f"⏳ {self.model} {type(e).__name__}, retrying in {delay:.1f}s "
+                      f"(concurrency {int(self.concurrency)})", file=sys.stderr)
+                report("rate_limited", model=self.model, error=type(e).__name__, attempt=attempt + 1,
+                       delay=round(delay, 3), concurrency=int(self.concurrency))
+                time.sleep(delay)
+                continue
+            self.release("success")
+            return result
+
+
+def get_limiter(model):
+    """Get the process-wide limiter for a model."""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = AdaptiveLimiter(model)
+            _limiters[model] = limiter
+    return limiter
+
+
+class _LimitedCompletions:
+    def __init__(self, completions):
+        self._completions = completions
+
+    def create(self, **kwargs):
+        return get_limiter(kwargs.get("model")).call(self._completions.create, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+
+class _LimitedChat:
+    def __init__(self, chat):
+        self.completions = _LimitedCompletions(chat.completions)
+        self._chat = chat
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class RateLimitedClient:
+    """
+    Wraps an OpenAI client so chat.completions.create goes through the model's limiter.
+    Everything else is passed through unchanged.
+    """
+
+    def __init__(self, client):
+        self.chat = _LimitedChat(client.chat)
+        self._client = client
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Persistent whole-pipeline result cache
+Keys results by the input audio hash plus pipeline parameters, with size-bounded LRU eviction
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+# Bump when prompts, models or output formats change so stale results are not reused
+PIPELINE_VERSION = 2
+
+DEFAULT_CACHE_DIR = "result_cache"
+DEFAULT_MAX_MB = 2048
+
+RESULT_FILE = "result.json"
+
+
+def cache_key(audio_hash, pipeline, **params):
+    """
+    Build a cache key from the audio content hash and the stage parameters.
+
+    Args:
+        audio_hash (str): SHA-256 of the input audio
+        pipeline (str): Pipeline name (e.g. "karaoke", "single_song")
+        **params: Stage parameters (model, target language, prompt version, ...)
+
+    Returns:
+        str: Hex digest identifying this result
+    """
+    payload = {
+        "audio": audio_hash,
+        "pipeline": pipeline,
+        "version": PIPELINE_VERSION,
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _replace_paths(value, path_map):
+    """Recursively replace strings that are original artifact paths with their cached copies."""
+    if isinstance(value, str):
+        return path_map.get(value, value)
+    if isinstance(value, dict):
+        return {k: _replace_paths(v, path_map) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_paths(v, path_map) for v in value]
+    return value
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ResultCache:
+    """
+    Disk cache of pipeline results. Each entry is a directory holding result.json
+    and copies of its artifact files (stems, transcripts, mixes), so entries stay
+    valid after the pipeline's own output directories are overwritten.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Args:
+            cache_dir (str): Cache directory (env RESULT_CACHE_DIR)
+            max_bytes (int): Size limit before LRU eviction (env RESULT_CACHE_MAX_MB)
+        """
+        self.cache_dir = cache_dir or os.getenv("RESULT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.getenv("RESULT_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """
+        Look up a cached result and mark it as recently used.
+
+        Returns:
+            dict: Cached result, or None on a miss
+        """
+        result_file = os.path.join(self._entry_dir(key), RESULT_FILE)
+        try:
+            with open(result_file, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            # The result file's mtime is the entry's last access time
+            os.utime(result_file, None)
+        except (OSError, ValueError):
+            return None
+
+        print(f"♻️ Result cache hit: {key[:12]}", file=sys.stderr)
+        return result
+
+    def restore(self, result, destinations):
+        """
+        Copy cached artifacts out of the cache, e.g. into a run's output
+        directory, so callers do not hand out paths that eviction can delete.
+
+        Args:
+            result (dict): Result from get()
+            destinations (dict): Result field -> path the artifact should have
+
+        Returns:
+            dict: The result with those fields pointing at the restored files, or None
+            if an artifact is no longer in the cache (evicted meanwhile)
+        """
+        restored = dict(result)
+        for field, destination in destinations.items():
+            source = result.get(field)
+            if not source:
+                continue
+            directory = os.path.dirname(destination)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            try:
+                # A copy, not a hard link: later runs overwrite these files in place
+                shutil.copy2(source, destination)
+            except OSError as e:
+                print(f"⚠️ Could not restore cached {field}: {e}", file=sys.stderr)
+                return None
+            restored[field] = destination
+        return restored
+
+    def put(self, key, result, artifacts=()):
+        """
+        Store a result and copies of its artifact files.
+
+        Args:
+            key (str): Key from cache_key()
+            result (dict): JSON-serializable result
+            artifacts (iterable): Paths of files referenced by the result
+
+        Returns:
+            dict: The result with artifact paths pointing into the cache
+        """
+        entry_dir = self._entry_dir(key)
+        temp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            path_map = {}
+            for i, artifact in enumerate(artifacts):
+                if not artifact or not os.path.exists(artifact):
+                    continue
+                name = f"{i}_{os.path.basename(artifact)}"
+                shutil.copy2(artifact, os.path.join(temp_dir, name))
+                path_map[str(artifact)] = os.path.join(entry_dir, name)
+
+            cached_result = _replace_paths(result, path_map)
+            with open(os.path.join(temp_dir, RESULT_FILE), "w", encoding="utf-8") as f:
+                json.dump(cached_result, f, ensure_ascii=False)
+
+            try:
+                os.rename(temp_dir, entry_dir)
+            except OSError:
+                # Another worker stored the same key first
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                cached = self.get(key)
+                return cached if cached is not None else result
+        except Exception as e:
+            print(f"⚠️ Could not store result in cache: {e}", file=sys.stderr)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return result
+
+        self.evict()
+        return cached_result
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.isdir(entry_dir):
+                continue
+            try:
+                last_used = os.path.getmtime(os.path.join(entry_dir, RESULT_FILE))
+            except OSError:
+                last_used = 0
+            size = _dir_size(entry_dir)
+            entries.append((last_used, size, entry_dir))
+            total += size
+
+        if total <= self.max_bytes:
+            return
+
+        for last_used, size, entry_dir in sorted(entries):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            print(f"🗑️ Evicted cached result {os.path.basename(entry_dir)[:12]} "
+                  f"(last used {time.ctime(last_used)})", file=sys.stderr)
+            if total <= self.max_bytes:
+                break
+
+
+_default_cache = None
+
+
+def get_result_cache():
+    """Get the process-wide ResultCache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
@@ -4,10 +4,12 @@ Reverse Song Translator
 Translates foreign songs TO English using Boson AI.
 """
 
-import os
 import sys
 from dotenv import load_dotenv
-from openai import OpenAI
+from boson_client import get_client
+from llm_cache import cached_chat_completion
+from translation_memory import memory_context, numbered_request, parse_numbered_lines, translate_with_memory
+from language_id import detect_language as local_detect_language, is_language_name
 
 # Load environment variables
 load_dotenv()
@@ -15,14 +17,19 @@ load_dotenv()
 class ReverseSongTranslator:
     def __init__(self):
         """Initialize the reverse song translator."""
-        self.client = OpenAI(
-            api_key=os.getenv("BOSON_API_KEY"),
-            base_url="https://hackathon.boson.ai/v1"
-        )
+        self.client = get_client()
     
-    def detect_language(self, text):
+    def detect_language(self, text, audio=None, sample_rate=None):
         """
         Detect the source language of the text.
+        Answers locally from the text (or the vocals audio, if given) and only asks
+        the LLM when the local identification is not confident.
+        """
+        return local_detect_language(text, self._detect_language_llm, audio, sample_rate)
+    
+    def _detect_language_llm(self, text):
+        """
+        Detect the source language of the text with the LLM.
         """
         print(f"🔍 Detecting source language...")
         
@@ -35,7 +42,9 @@ CRITICAL OUTPUT REQUIREMENTS:
 - Output ONLY the clean language name, nothing else"""
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client,
+                accept=is_language_name,
                 model="Qwen3-32B-thinking-Hackathon",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -77,21 +86,31 @@ CRITICAL OUTPUT REQUIREMENTS:
 - Each line should be a direct translation of the corresponding original line
 - Start immediately with the first translated line, no introduction"""
         
-        try:
+        def request(lyrics):
             response = self.client.chat.completions.create(
                 model="Qwen3-32B-thinking-Hackathon",
                 messages=[
                     {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Translate these {source_language} lyrics to English:\n\n{foreign_lyrics}"}
+                    {"role": "user", "content": f"Translate these {source_language} lyrics to English:\n\n{lyrics}"}
                 ],
                 max_completion_tokens=2048,
                 temperature=0.7
             )
-            
-            translation = response.choices[0].message.content.strip()
-            
-            # Clean the translation output
-            clean_translation = self._clean_translation_output(translation)
+            return response.choices[0].message.content.strip()
+        
+        def translate_lines(lines):
+            # Numbered lines map back one-to-one, so the lossy cleanup is not needed here
+            return parse_numbered_lines(request(numbered_request(lines)), len(lines))
+        
+        try:
+            # Repeated and previously translated lines are not sent again
+            clean_translation = translate_with_memory(
+                foreign_lyrics, source_language, "English", translate_lines,
+                context=memory_context("Qwen3-32B-thinking-Hackathon", system_prompt),
+            )
+            if not clean_translation:
+                # Clean the translation output
+                clean_translation = self._clean_translation_output(request(foreign_lyrics))
             
             if clean_translation and len(clean_translation) > 10:
                 print(f"✅ {source_language} to English translation completed!")
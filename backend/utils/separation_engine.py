@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+In-process Demucs separation engine
+Loads a Demucs model once per process through the library API and separates in-memory audio
+"""
+
+import os
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from job_queue import DEFAULT_MAX_WORKERS
+
+DEFAULT_MODEL = os.getenv("DEMUCS_MODEL", "htdemucs")
+
+# Segmented separation: segment length, overlap between neighbours and pool size
+SEGMENT_SECONDS = float(os.getenv("SEPARATION_SEGMENT_SECONDS", "30"))
+OVERLAP_SECONDS = float(os.getenv("SEPARATION_OVERLAP_SECONDS", "2"))
+# Every job worker has its own segment pool, so they share the cores between them
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", DEFAULT_MAX_WORKERS))
+SEGMENT_WORKERS = int(os.getenv("SEPARATION_WORKERS", max(1, (os.cpu_count() or 1) // max(1, JOB_WORKERS))))
+
+_segment_pools = {}
+_segment_pool_lock = threading.Lock()
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+class DemucsEngine:
+    """
+    A resident Demucs model. The model is loaded on first use and reused for every
+    song, so the per-song cost is only the separation itself, not interpreter
+    startup, torch import and weight loading as with the demucs CLI.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, device=None, shifts=0, overlap=0.25):
+        """
+        Args:
+            model_name (str): Pretrained Demucs model name (htdemucs, mdx_extra, mdx_q, ...)
+            device (str): Torch device, defaults to cuda when available, else cpu
+            shifts (int): Random shift augmentation passes (0 is fastest)
+            overlap (float): Overlap between Demucs' internal split windows
+        """
+        self.model_name = model_name
+        self.device = device
+        self.shifts = shifts
+        self.overlap = overlap
+        self.model = None
+        self._lock = threading.Lock()
+
+    @property
+    def samplerate(self):
+        return self.load().samplerate
+
+    def load(self):
+        """Load the model if it is not loaded yet and return it."""
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    import torch
+                    from demucs.pretrained import get_model
+
+                    if self.device is None:
+                        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+                    print(f"Loading Demucs model {self.model_name} on {self.device}", file=sys.stderr)
+                    model = get_model(self.model_name)
+                    model.to(self.device)
+                    model.eval()
+                    self.model = model
+        return self.model
+
+    def separate(self, audio, sample_rate):
+        """
+        Separate vocals from accompaniment.
+
+        Args:
+            audio (np.ndarray | torch.Tensor): Audio shaped (channels, samples) or (samples,)
+            sample_rate (int): Sample rate of the audio
+
+        Returns:
+            tuple: (vocals, no_vocals, sample_rate) with float32 arrays shaped (channels, samples)
+        """
+        import torch
+        from demucs.apply import apply_model
+        from demucs.audio import convert_audio
+
+        model = self.load()
+
+        wav = torch.as_tensor(audio, dtype=torch.float32)
+        if wav.dim() == 1:
+            wav = wav.unsqueeze(0)
+        wav = convert_audio(wav, sample_rate, model.samplerate, model.audio_channels)
+
+        # Normalize like the demucs CLI does
+        ref = wav.mean(0)
+        mean, std = ref.mean(), ref.std() + 1e-8
+        wav = (wav - mean) / std
+
+        with torch.no_grad():
+            sources = apply_model(
+                model, wav[None], device=self.device, shifts=self.shifts,
+                split=True, overlap=self.overlap, progress=False,
+            )[0]
+        sources = sources * std + mean
+
+        vocals_index = model.sources.index("vocals")
+        vocals = sources[vocals_index]
+        no_vocals = sources.sum(0) - vocals
+
+        return (
+            vocals.cpu().numpy().astype(np.float32),
+            no_vocals.cpu().numpy().astype(np.float32),
+            model.samplerate,
+        )
+
+
+def get_engine(model_name=DEFAULT_MODEL):
+    """Get the process-wide engine for a model, creating it on first use."""
+    with _engines_lock:
+        engine = _engines.get(model_name)
+        if engine is None:
+            engine = DemucsEngine(model_name)
+            _engines[model_name] = engine
+    return engine
+
+
+def warm_up(model_name=DEFAULT_MODEL):
+    """
+    Load the model ahead of the first song, e.g. as a worker process initializer.
+    Failures are only logged, since separation falls back to the demucs CLI.
+    """
+    try:
+        get_engine(model_name).load()
+    except Exception as e:
+        print(f"⚠️ Could not preload Demucs model {model_name}: {e}", file=sys.stderr)
+
+
+def _init_segment_worker(model_name):
+    """Segment pool initializer: one torch thread per process, model loaded once."""
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    warm_up(model_name)
+
+
+def _separate_segment(model_name, segment, sample_rate):
+    """Separate one segment in a pool worker (module-level so it can be pickled)."""
+    return get_engine(model_name).separate(segment, sample_rate)
+
+
+def _get_segment_pool(model_name, workers):
+    # Spawned, not forked: the calling worker may already have started torch/OpenMP threads
+    key = (model_name, workers)
+    with _segment_pool_lock:
+        pool = _segment_pools.get(key)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_segment_worker,
+                initargs=(model_name,),
+            )
+            _segment_pools[key] = pool
+    return pool
+
+
+def split_segments(num_samples, sample_rate, segment_seconds=SEGMENT_SECONDS, overlap_seconds=OVERLAP_SECONDS):
+    """
+    Plan overlapping segments over a signal.
+
+    Returns:
+        list: (start, end) sample ranges; neighbours overlap by overlap_seconds
+    """
+    segment = max(1, int(segment_seconds * sample_rate))
+    overlap = min(int(overlap_seconds * sample_rate), segment // 2)
+    hop = segment - overlap
+
+    ranges = []
+    start = 0
+    while True:
+        end = min(start + segment, num_samples)
+        ranges.append((start, end))
+        if end >= num_samples:
+            break
+        start += hop
+    return ranges
+
+
+def _fade_window(length, fade_in, fade_out):
+    """Window of ones with raised-cosine fades; complementary fades sum to exactly 1."""
+    window = np.ones(length, dtype=np.float32)
+    if fade_in > 0:
+        t = np.linspace(0.0, 1.0, fade_in, endpoint=False, dtype=np.float32)
+        window[:fade_in] = np.sin(0.5 * np.pi * t) ** 2
+    if fade_out > 0:
+        t = np.linspace(0.0, 1.0, fade_out, endpoint=False, dtype=np.float32)
+        window[length - fade_out:] = np.cos(0.5 * np.pi * t) ** 2
+    return window
+
+
+def separate_segmented(audio, sample_rate, model_name=DEFAULT_MODEL, workers=SEGMENT_WORKERS,
+                       segment_seconds=SEGMENT_SECONDS, overlap_seconds=OVERLAP_SECONDS):
+    """
+    Separate a long song by splitting it into overlapping segments, separating them
+    in parallel in a process pool and stitching the stems back with windowed overlap-add.
+    Each segment costs the same, so run time grows linearly with song length.
+
+    Args:
+        audio (np.ndarray): Audio shaped (channels, samples)
+        sample_rate (int): Sample rate of the audio
+        model_name (str): Demucs model used by every pool worker
+        workers (int): Number of pool processes (default SEPARATION_WORKERS, else the
+            cores divided among JOB_WORKERS job workers)
+        segment_seconds (float): Segment length
+        overlap_seconds (float): Overlap between neighbouring segments
+
+    Returns:
+        tuple: (vocals, no_vocals, sample_rate) with float32 arrays shaped (channels, samples)
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim == 1:
+        audio = audio[None, :]
+    num_samples = audio.shape[1]
+    ranges = split_segments(num_samples, sample_rate, segment_seconds, overlap_seconds)
+
+    if len(ranges) == 1:
+        return get_engine(model_name).separate(audio, sample_rate)
+
+    pool = _get_segment_pool(model_name, workers)
+    print(f"Separating {len(ranges)} segments across {workers} processes", file=sys.stderr)
+    futures = [
+        pool.submit(_separate_segment, model_name, audio[:, start:end], sample_rate)
+        for start, end in ranges
+    ]
+
+    vocals_out = no_vocals_out = None
+    weights = None
+    for i, ((start, end), future) in enumerate(zip(ranges, futures)):
+        vocals, no_vocals, out_rate = future.result()
+        ratio = out_rate / sample_rate
+
+        if vocals_out is None:
+            total = int(round(num_samples * ratio))
+            vocals_out = np.zeros((vocals.shape[0], total), dtype=np.float32)
+            no_vocals_out = np.zeros_like(vocals_out)
+            weights = np.zeros(total, dtype=np.float32)
+
+        offset = int(round(start * ratio))
+        length = min(vocals.shape[1], vocals_out.shape[1] - offset)
+
+        # Fade only where this segment overlaps a neighbour
+        fade_in = int(round((ranges[i - 1][1] - start) * ratio)) if i > 0 else 0
+        fade_out = int(round((end - ranges[i + 1][0]) * ratio)) if i + 1 < len(ranges) else 0
+        window = _fade_window(length, min(fade_in, length), min(fade_out, length))
+
+        vocals_out[:, offset:offset + length] += vocals[:, :length] * window
+        no_vocals_out[:, offset:offset + length] += no_vocals[:, :length] * window
+        weights[offset:offset + length] += window
+
+    # Fades are complementary, but normalize anyway to absorb rounding at the seams
+    weights = np.maximum(weights, 1e-8)
+    return vocals_out / weights, no_vocals_out / weights, out_rate
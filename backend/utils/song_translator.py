@@ -1,6 +1,22 @@
 import os
+import re
 import sys
-from boson_client import client
+import json
+from boson_client import get_client
+from llm_cache import cached_chat_completion
+from language_id import detect_language as local_detect_language, is_language_name
+from translation_fanout import translate_languages
+from translation_memory import (memory_context, numbered_request, parse_numbered_lines,
+                                translate_many_with_memory, translate_with_memory)
+
+# Prompt for translate_song_batch; the template (not the filled-in text) keys its translation memory entries
+BATCH_SYSTEM_PROMPT = """You are a professional song translator. Translate {source_language} song lyrics into several languages at once while preserving poeticism, rhymes, syllable count and musical flow in each language.
+
+Think internally, then output ONLY a JSON object:
+- One key per target language, exactly these: {languages_json}
+- Each value is an array of exactly {line_count} strings: the translation of original line 1, line 2, ... in order
+- Do NOT number the lines, merge lines or split lines
+- No reasoning, explanations or text outside the JSON object"""
 
 class SongTranslator:
     """
@@ -63,14 +79,8 @@ CRITICAL OUTPUT REQUIREMENTS:
 
 Output only the translated lyrics with no additional text."""
         
-        user_prompt = f"""Translate these {source_language} song lyrics to {target_language}:
-
-{original_transcript}
-
-Output only the translated lyrics in {target_language}."""
-
-        try:
-            response = client.chat.completions.create(
+        def request(user_prompt):
+            response = get_client().chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -79,18 +89,135 @@ Output only the translated lyrics in {target_language}."""
                 max_completion_tokens=1024,
                 temperature=0.7,  # Slightly higher for creativity while maintaining accuracy
             )
+            return response.choices[0].message.content.strip()
+        
+        def translate_lines(lines):
+            # Numbered lines map back one-to-one, so the lossy cleanup is not needed here
+            content = request(f"""Translate these {len(lines)} {source_language} song lyric lines to {target_language}:
+
+{numbered_request(lines)}""")
+            return parse_numbered_lines(content, len(lines))
+
+        try:
+            # Repeated and previously translated lines are not sent again
+            translated_lyrics = translate_with_memory(
+                original_transcript, source_language, target_language, translate_lines,
+                context=memory_context(self.model, system_prompt, preserve_style),
+            )
+            if translated_lyrics:
+                return translated_lyrics
             
-            translated_lyrics = response.choices[0].message.content.strip()
+            translated_lyrics = request(f"""Translate these {source_language} song lyrics to {target_language}:
+
+{original_transcript}
+
+Output only the translated lyrics in {target_language}.""")
             
             # Clean up any remaining reasoning or analysis that might have leaked through
-            translated_lyrics = self._clean_translation_output(translated_lyrics)
-            
-            return translated_lyrics
+            return self._clean_translation_output(translated_lyrics)
             
         except Exception as e:
             print(f"Translation failed: {e}")
             return f"Translation failed: {str(e)}"
     
+    def translate_song_batch(self, original_transcript, target_languages, source_language="English", fallback=None):
+        """
+        Translate song lyrics into several languages with a single model call.
+        
+        The lyrics and instructions are sent once and the model answers with one JSON
+        object holding every translation, so input tokens and round trips no longer
+        grow with the number of languages. Each language is validated (present, one
+        translated line per original line); only the languages that fail are
+        translated again one language per call, concurrently. Lines each language
+        already has in the translation memory are not sent.
+        
+        Args:
+            original_transcript (str): The original song transcript
+            target_languages (list): Target languages (e.g., ["Spanish", "French"])
+            source_language (str): Source language of the original transcript
+            fallback (callable): fallback(text, language) -> translation for languages the
+                batch answer did not cover (default: translate_song)
+            
+        Returns:
+            dict: Language -> clean translated lyrics (or a "Translation failed" message)
+        """
+        lines = [line.strip() for line in original_transcript.split("\n") if line.strip()]
+        
+        def request(batch_lines, languages):
+            numbered = "\n".join(f"{i + 1}. {line}" for i, line in enumerate(batch_lines))
+            system_prompt = BATCH_SYSTEM_PROMPT.format(
+                source_language=source_language,
+                languages_json=json.dumps(list(languages), ensure_ascii=False),
+                line_count=len(batch_lines),
+            )
+            user_prompt = f"""Translate these {len(batch_lines)} {source_language} lyric lines into {", ".join(languages)}:
+
+{numbered}"""
+            response = get_client().chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_completion_tokens=1024 * (len(languages) + 1),
+                temperature=0.7,
+            )
+            return self._parse_batch_translation(response.choices[0].message.content, languages, len(batch_lines))
+        
+        translations = {}
+        try:
+            if not lines:
+                raise ValueError("empty transcript")
+            # Each language reuses its remembered lines; only lines some language is missing are sent
+            remembered = translate_many_with_memory(
+                original_transcript, source_language, target_languages, request,
+                context=memory_context(self.model, BATCH_SYSTEM_PROMPT),
+            )
+            if remembered is not None:
+                translations = remembered
+            else:
+                translations = {language: "\n".join(translated)
+                                for language, translated in request(lines, target_languages).items()}
+        except Exception as e:
+            print(f"Batch translation failed: {e}")
+        
+        failed = [language for language in target_languages if language not in translations]
+        if failed:
+            print(f"⚠️ Batch translation invalid for {failed}, translating them separately")
+            if fallback is None:
+                fallback = lambda text, language: self.translate_song(text, language, source_language)
+            results = translate_languages(original_transcript, failed, fallback)
+            for language, result in results.items():
+                translations[language] = result["translation"] or f"Translation failed: {result['error']}"
+        
+        return {language: translations[language] for language in target_languages}
+    
+    def _parse_batch_translation(self, content, target_languages, line_count):
+        """
+        Extract the per-language translations from a batch answer.
+        
+        Returns:
+            dict: Language -> list of translated lines, only for languages with exactly line_count lines
+        """
+        content = re.sub(r"<think>.*?</think>", "", content or "", flags=re.DOTALL)
+        start, end = content.find("{"), content.rfind("}")
+        if start < 0 or end < start:
+            return {}
+        try:
+            data = json.loads(content[start:end + 1])
+        except ValueError:
+            return {}
+        
+        # Tolerate the model changing the case of a language name
+        by_name = {str(key).strip().lower(): value for key, value in data.items()}
+        valid = {}
+        for language in target_languages:
+            value = by_name.get(language.lower())
+            if (isinstance(value, list) and len(value) == line_count
+                    and all(isinstance(line, str) and line.strip() for line in value)):
+                valid[language] = [line.strip() for line in value]
+        return valid
+    
     def _clean_translation_output(self, text):
         """
         Clean up translation output to remove any reasoning or analysis that might have leaked through.
@@ -162,7 +289,7 @@ TRANSLATION:
 Please translate these lyrics to {target_language} and provide analysis of your translation choices."""
 
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -214,18 +341,28 @@ def translate_song_simple(original_transcript, target_language, source_language=
     translator = SongTranslator()
     return translator.translate_song(original_transcript, target_language, source_language)
 
-def detect_language(text):
+def detect_language(text, audio=None, sample_rate=None):
     """
-    Detect the language of the input text using the LLM.
+    Detect the language of the input text, locally when confident, else using the LLM.
     
     Args:
         text (str): Text to detect language for
+        audio (np.ndarray): Optional vocals to identify the language from if the text is inconclusive
+        sample_rate (int): Sample rate of audio
         
     Returns:
         str: Detected language name
     """
+    return local_detect_language(text, _detect_language_llm, audio, sample_rate)
+
+def _detect_language_llm(text):
+    """
+    Detect the language of the input text using the LLM.
+    """
     try:
-        response = client.chat.completions.create(
+        response = cached_chat_completion(
+            get_client(),
+            accept=is_language_name,
             model="Qwen3-32B-thinking-Hackathon",
             messages=[
                 {"role": "system", "content": "You are a language detection expert. Identify the language of the given text and return only the language name in English (e.g., 'English', 'Spanish', 'French', 'German', 'Italian', 'Portuguese', 'Russian', 'Chinese', 'Japanese', 'Korean', etc.)."},
@@ -293,6 +430,13 @@ Bicycling on every Wednesday afternoon"""
     print(french_translation)
     print("=" * 50)
     
+    # Test batch translation
+    print("Batch translation (Spanish, French, German):")
+    for language, translation in translator.translate_song_batch(sample_lyrics, ["Spanish", "French", "German"], "English").items():
+        print(f"--- {language} ---")
+        print(translation)
+    print("=" * 50)
+    
     # Test with analysis
     print("German translation with analysis:")
     german_result = translator.translate_with_analysis(sample_lyrics, "German", "English")
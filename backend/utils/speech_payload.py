@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compact audio payloads for speech transcription requests
+Downmixes to mono and resamples to 16 kHz before base64 encoding, with a per-chunk cache
+"""
+
+import io
+import os
+import sys
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+from audio_buffer import decode_audio, to_mono
+
+# Speech models work at 16 kHz mono; anything above is wasted upload
+SPEECH_SAMPLE_RATE = 16000
+# "wav" (16-bit PCM) is the format input_audio documents, next to mp3. "flac" (lossless)
+# and "opus" (smallest) are opt-in for endpoints known to accept them
+PAYLOAD_FORMAT = os.getenv("TRANSCRIPTION_AUDIO_FORMAT", "wav")
+PAYLOAD_CACHE_SIZE = int(os.getenv("TRANSCRIPTION_PAYLOAD_CACHE_SIZE", "64"))
+
+# soundfile container/subtype and the format name sent to the API
+_FORMATS = {
+    "flac": ("FLAC", "PCM_16", "flac"),
+    "opus": ("OGG", "OPUS", "ogg"),
+    "wav": ("WAV", "PCM_16", "wav"),
+}
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def to_speech_audio(audio, sample_rate):
+    """Downmix to mono and resample to SPEECH_SAMPLE_RATE."""
+    mono = to_mono(audio)
+    if sample_rate != SPEECH_SAMPLE_RATE:
+        mono = resample_poly(mono, SPEECH_SAMPLE_RATE, sample_rate)
+    return np.clip(mono, -1.0, 1.0).astype(np.float32)
+
+
+def _encode(speech, fmt):
+    container, subtype, api_format = _FORMATS[fmt]
+    buffer = io.BytesIO()
+    sf.write(buffer, speech, SPEECH_SAMPLE_RATE, format=container, subtype=subtype)
+    return base64.b64encode(buffer.getvalue()).decode("utf-8"), api_format
+
+
+def _cache_get(key):
+    with _cache_lock:
+        payload = _cache.get(key)
+        if payload is not None:
+            _cache.move_to_end(key)
+        return payload
+
+
+def _cache_put(key, payload):
+    with _cache_lock:
+        _cache[key] = payload
+        _cache.move_to_end(key)
+        while len(_cache) > PAYLOAD_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def prepare_speech_payload(audio=None, sample_rate=None, file_path=None, fmt=None):
+    """
+    Build the base64 audio payload for a transcription request.
+
+    A 90 s chunk of 44.1 kHz stereo WAV is ~15 MB; as 16 kHz mono PCM16 WAV it is
+    ~2.9 MB. FLAC and Opus shrink it further where the endpoint accepts them. Results
+    are cached per chunk content, so fallback methods and retries on the same chunk do
+    not encode it again.
+
+    Args:
+        audio (np.ndarray): Audio shaped (channels, samples) or (samples,)
+        sample_rate (int): Sample rate of audio
+        file_path (str): Audio file to use instead of an array
+        fmt (str): "wav", "flac" or "opus" (default TRANSCRIPTION_AUDIO_FORMAT)
+
+    Returns:
+        tuple: (base64 data, format name for input_audio)
+    """
+    fmt = fmt or PAYLOAD_FORMAT
+    if fmt not in _FORMATS:
+        raise ValueError(f"Unknown transcription audio format: {fmt}")
+
+    if audio is not None:
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        digest = hashlib.sha1(audio.tobytes()).hexdigest()
+        key = (digest, audio.shape, sample_rate, fmt)
+    else:
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime, fmt)
+
+    payload = _cache_get(key)
+    if payload is not None:
+        return payload
+
+    if audio is not None:
+        speech = to_speech_audio(audio, sample_rate)
+    else:
+        # Let ffmpeg downmix and resample while decoding
+        decoded, _ = decode_audio(file_path, sample_rate=SPEECH_SAMPLE_RATE, channels=1)
+        speech = np.clip(decoded[0], -1.0, 1.0)
+
+    payload = _encode(speech, fmt)
+    print(f"Prepared {fmt} speech payload: {len(payload[0]) / 1024:.0f} KB base64", file=sys.stderr)
+    _cache_put(key, payload)
+    return payload
@@ -28,18 +28,9 @@ def get_audio_duration(file_path):
 def translate_text(text, from_lang, to_lang):
     """Translate text using a real translation API"""
     try:
-        # Import OpenAI client for translation
-        import openai
-        from dotenv import load_dotenv
-        
-        # Load environment variables
-        load_dotenv()
-        
-        # Initialize OpenAI client
-        client = openai.OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY'),
-            base_url="https://hackathon.boson.ai/v1"
-        )
+        # Shared pooled client (created once per process)
+        from boson_client import get_client
+        client = get_client()
         
         # Create translation prompt
         translation_prompt = f"""Translate the following text from {from_lang} to {to_lang}. 
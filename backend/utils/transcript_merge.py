@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Seam-aware merging of chunk transcripts
+Removes words transcribed twice where overlapping audio chunks meet, in linear time
+"""
+
+import re
+
+# Tokens at a chunk edge that may be a cut-off word and are allowed to differ
+EDGE_SLACK = 2
+# Shorter matches are likely a genuinely repeated word, not a duplicated seam
+MIN_OVERLAP_TOKENS = 2
+
+_WORD = re.compile(r"\S+")
+_PUNCTUATION = re.compile(r"[^\w']+")
+
+
+def _normalize(token):
+    return _PUNCTUATION.sub("", token.lower())
+
+
+def _prefix_function(seq):
+    """KMP prefix function: pi[i] is the longest proper border of seq[:i + 1]."""
+    pi = [0] * len(seq)
+    k = 0
+    for i in range(1, len(seq)):
+        while k and seq[i] != seq[k]:
+            k = pi[k - 1]
+        if seq[i] == seq[k]:
+            k += 1
+        pi[i] = k
+    return pi
+
+
+def longest_suffix_prefix(a, b):
+    """
+    Length of the longest suffix of token list a that equals a prefix of token list b.
+
+    Runs the KMP prefix function over b + [separator] + a, so the cost is linear in
+    len(a) + len(b).
+    """
+    if not a or not b:
+        return 0
+    pi = _prefix_function(list(b) + [None] + list(a))
+    return pi[-1]
+
+
+def _cut_word_continues(a_norm, a_index, b_norm, b_index):
+    """True if a_norm[a_index] is a cut-off start of the different word b_norm[b_index]."""
+    if a_index >= len(a_norm) or b_index >= len(b_norm):
+        return False
+    cut, word = a_norm[a_index], b_norm[b_index]
+    return bool(cut) and cut != word and word.startswith(cut)
+
+
+def seam_overlap(a_tokens, b_tokens, max_tokens, slack=EDGE_SLACK, min_tokens=MIN_OVERLAP_TOKENS):
+    """
+    Find words duplicated across a seam.
+
+    Only the last max_tokens of a and the first max_tokens of b are compared. Up to
+    slack tokens at each edge may be a word cut in half by the chunk boundary, so
+    they are skipped while searching and dropped with the duplicate. A match shorter
+    than min_tokens still counts when the cut-off word after it in a is the start of
+    the word after it in b ("three fo" | "three four").
+
+    Returns:
+        tuple: (tokens to drop from the end of a, tokens to drop from the start of b)
+    """
+    a_norm = [_normalize(t) for t in a_tokens[-max_tokens:]]
+    b_norm = [_normalize(t) for t in b_tokens[:max_tokens]]
+
+    best = (0, 0, 0)
+    for a_trim in range(min(slack, len(a_norm)) + 1):
+        tail = a_norm[:len(a_norm) - a_trim]
+        for b_trim in range(min(slack, len(b_norm)) + 1):
+            length = longest_suffix_prefix(tail, b_norm[b_trim:])
+            if length <= best[0]:
+                continue
+            if length >= min_tokens or _cut_word_continues(a_norm, len(tail), b_norm, b_trim + length):
+                best = (length, a_trim, b_trim)
+
+    length, a_trim, b_trim = best
+    if not length:
+        return 0, 0
+    return a_trim, b_trim + length
+
+
+def _drop_leading_words(text, count):
+    """Remove the first count words of text, keeping its line breaks."""
+    if count <= 0:
+        return text
+    matches = list(_WORD.finditer(text))
+    if count >= len(matches):
+        return ""
+    return text[matches[count].start():]
+
+
+def _drop_trailing_words(text, count):
+    """Remove the last count words of text, keeping its line breaks."""
+    if count <= 0:
+        return text
+    matches = list(_WORD.finditer(text))
+    if count >= len(matches):
+        return ""
+    return text[:matches[-count - 1].end()]
+
+
+def trim_seams(texts, max_overlap_tokens=40):
+    """
+    Remove the words each pair of neighbouring chunks both transcribed from their
+    shared audio. The earlier chunk keeps its copy. Only adjacent chunks share audio,
+    so an empty (failed) chunk leaves the chunks on either side untouched.
+
+    Args:
+        texts (list): Chunk transcripts in order
+        max_overlap_tokens (int): Most words the audio overlap can contain
+
+    Returns:
+        list: The transcripts with duplicated seam words removed, one per input
+    """
+    trimmed = [(text or "").strip() for text in texts]
+    for i in range(1, len(trimmed)):
+        previous, text = trimmed[i - 1], trimmed[i]
+        if previous and text:
+            drop_a, drop_b = seam_overlap(_WORD.findall(previous), _WORD.findall(text), max_overlap_tokens)
+            trimmed[i - 1] = _drop_trailing_words(previous, drop_a)
+            trimmed[i] = _drop_leading_words(text, drop_b)
+    return trimmed
+
+
+def merge_transcripts(texts, max_overlap_tokens=40):
+    """Join chunk transcripts in order with duplicated seam words removed (see trim_seams)."""
+    return " ".join(text for text in trim_seams(texts, max_overlap_tokens) if text)
@@ -6,25 +6,17 @@ Translation script for text translation
 import sys
 import os
 import json
-from dotenv import load_dotenv
 
 # Add utils to path
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
+from boson_client import get_client
+
 def translate_text(text, from_lang, to_lang, return_reasoning=False):
     """Translate text using a real translation API. Returns clean translation and optionally reasoning."""
     try:
-        # Import OpenAI client for translation
-        import openai
-        
-        # Load environment variables
-        load_dotenv()
-        
-        # Initialize OpenAI client
-        client = openai.OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY'),
-            base_url="https://hackathon.boson.ai/v1"
-        )
+        # Shared pooled client (created once per process)
+        client = get_client()
         
         # Create translation prompt
         translation_prompt = f"""You are a friendly, professional translator. Translate the following text from {from_lang} to {to_lang}.
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-language translation
+Runs one translation per target language in parallel under a process-wide concurrency limit
+"""
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Translation calls in flight at once across the whole process
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+
+_slots = threading.BoundedSemaphore(TRANSLATION_CONCURRENCY)
+
+
+def _translate_one(translate, text, language):
+    result = {"language": language, "translation": None, "error": None, "duration": None}
+    with _slots:
+        start = time.perf_counter()
+        try:
+            result["translation"] = translate(text, language)
+            if not result["translation"]:
+                result["error"] = "Empty translation"
+        except Exception as e:
+            result["error"] = str(e)
+        result["duration"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def translate_languages(text, languages, translate, max_workers=None):
+    """
+    Translate text into several languages concurrently.
+
+    Wall time is close to that of the slowest single translation, as long as the
+    languages fit in TRANSLATION_CONCURRENCY; other fan-outs in the process share
+    the same limit, so parallel jobs cannot multiply the load on the API.
+
+    Args:
+        text (str): Text to translate
+        languages (list): Target language names
+        translate (callable): translate(text, language) -> translation
+        max_workers (int): Threads for this fan-out (default: one per language)
+
+    Returns:
+        dict: Per language {"language", "translation", "error", "duration"}, in the order given
+    """
+    if not languages:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(languages), thread_name_prefix="translate") as executor:
+        futures = [executor.submit(_translate_one, translate, text, language) for language in languages]
+        results = {future.result()["language"]: future.result() for future in futures}
+
+    failed = [language for language, result in results.items() if result["error"]]
+    if failed:
+        print(f"⚠️ {len(failed)}/{len(languages)} translations failed: {failed}", file=sys.stderr)
+    return results
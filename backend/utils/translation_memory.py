@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Line-level translation memory
+Sends each distinct lyric line to the translator once and remembers the result per language pair across songs
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+DEFAULT_MEMORY_PATH = os.path.join("result_cache", "translation_memory.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS line_translations (
+    source_language TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    context TEXT NOT NULL,
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source_language, target_language, context, source)
+)
+"""
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_BATCH = 500
+
+_memory = None
+_memory_lock = threading.Lock()
+
+_SPACES = re.compile(r"\s+")
+_NUMBERED = re.compile(r"^\s*(\d+)\s*[.):]\s*(.*?)\s*$")
+
+
+def normalize_line(line):
+    """Key for a lyric line: case, spacing and edge punctuation do not matter."""
+    return _SPACES.sub(" ", line or "").strip().lower().strip(" .,!?;:…\"'()-")
+
+
+def memory_context(*parts):
+    """
+    Key for how lines were translated (model, prompt, options). Translations made with
+    a different model or prompt are kept apart.
+    """
+    encoded = json.dumps(parts, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def numbered_request(lines):
+    """
+    Lyric lines numbered for the model, with the answer format parse_numbered_lines expects.
+    """
+    numbered = "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+    return (f"{numbered}\n\n"
+            f"Answer with exactly {len(lines)} numbered lines in the form \"<number>. <translation>\", "
+            "one for each numbered line above and in the same order. Never merge, split or skip lines.")
+
+
+def parse_numbered_lines(content, count):
+    """
+    Map a numbered answer back to its input lines.
+
+    Reasoning (<think> blocks) and unnumbered lines are ignored. The answer only counts
+    if every number from 1 to count appears exactly once with a non-empty translation.
+
+    Returns:
+        list: count translations in input order, or None if the answer is not one-to-one
+    """
+    if not content:
+        return None
+    content = re.sub(r"<think>.*?</think>", "", content, flags=re.DOTALL)
+    if "</think>" in content:
+        content = content.rsplit("</think>", 1)[1]
+
+    translations = {}
+    for line in content.split("\n"):
+        match = _NUMBERED.match(line)
+        if not match:
+            continue
+        number, text = int(match.group(1)), match.group(2)
+        if number < 1 or number > count or number in translations or not text:
+            return None
+        translations[number] = text
+    if len(translations) != count:
+        return None
+    return [translations[i] for i in range(1, count + 1)]
+
+
+class TranslationMemory:
+    """
+    SQLite store of translated lines keyed by language pair, translation context and
+    normalized source line. Safe to share between threads (one connection per thread)
+    and worker processes (WAL).
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): Database file (env TRANSLATION_MEMORY_PATH)
+        """
+        self.path = path or os.getenv("TRANSLATION_MEMORY_PATH", DEFAULT_MEMORY_PATH)
+        self._local = threading.local()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            connection.commit()
+            self._local.connection = connection
+        return connection
+
+    def lookup(self, source_language, target_language, context, keys):
+        """
+        Returns:
+            dict: Normalized source line -> translation, for the keys already known
+        """
+        connection = self._connection()
+        keys = list(keys)
+        found = {}
+        for i in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[i:i + LOOKUP_BATCH]
+            rows = connection.execute(
+                "SELECT source, translation FROM line_translations "
+                "WHERE source_language = ? AND target_language = ? AND context = ? "
+                f"AND source IN ({', '.join('?' * len(batch))})",
+                (source_language, target_language, context, *batch),
+            )
+            found.update(rows)
+        return found
+
+    def store(self, source_language, target_language, context, translations):
+        """Remember translations, a dict of normalized source line -> translated line."""
+        now = time.time()
+        connection = self._connection()
+        connection.executemany(
+            "INSERT OR REPLACE INTO line_translations "
+            "(source_language, target_language, context, source, translation, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(source_language, target_language, context, key, value, now)
+             for key, value in translations.items()],
+        )
+        connection.commit()
+
+
+def get_translation_memory():
+    """Get the process-wide translation memory, or None when disabled with TRANSLATION_MEMORY_ENABLED=false."""
+    global _memory
+    if os.getenv("TRANSLATION_MEMORY_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+    return _memory
+
+
+def translate_with_memory(text, source_language, target_language, translate_lines, context=""):
+    """
+    Translate lyrics line by line through the translation memory.
+
+    Repeated lines (a chorus) are sent once, lines already translated for this language
+    pair and context are not sent at all, and the answer is expanded back to the
+    original line order.
+
+    Args:
+        text (str): Lyrics, one line per line
+        source_language (str): Language of text
+        target_language (str): Language to translate into
+        translate_lines (callable): translate_lines(lines) -> one translation per line in
+            order, or None when the answer cannot be mapped back one-to-one
+            (see numbered_request and parse_numbered_lines)
+        context (str): Model/prompt key from memory_context
+
+    Returns:
+        str: Translated lyrics (blank lines dropped), or None when the memory is disabled
+        or the translator's answer could not be used; the caller then translates the
+        full text its usual way
+    """
+    translations = translate_many_with_memory(
+        text, source_language, [target_language],
+        lambda lines, languages: {target_language: translate_lines(lines)}, context,
+    )
+    return translations.get(target_language) if translations else None
+
+
+def translate_many_with_memory(text, source_language, target_languages, translate_lines, context=""):
+    """
+    translate_with_memory for several target languages answered by one request.
+
+    Each language looks up its own known lines. The lines missing for any language are
+    sent once, and only for the languages that miss some.
+
+    Args:
+        text (str): Lyrics, one line per line
+        source_language (str): Language of text
+        target_languages (list): Languages to translate into
+        translate_lines (callable): translate_lines(lines, languages) -> dict of language
+            -> one translation per line in order; languages whose answer cannot be mapped
+            back one-to-one may be left out
+        context (str): Model/prompt key from memory_context
+
+    Returns:
+        dict: Language -> translated lyrics (blank lines dropped), without the languages
+        whose answer could not be used, or None when the memory is disabled or
+        unavailable; the caller translates what is missing its usual way
+    """
+    memory = get_translation_memory()
+    lines = [line.strip() for line in (text or "").split("\n") if normalize_line(line)]
+    if memory is None or not lines or not source_language or source_language == "Unknown":
+        return None
+
+    keys = [normalize_line(line) for line in lines]
+    first_seen = {}
+    for key, line in zip(keys, lines):
+        first_seen.setdefault(key, line)
+
+    try:
+        known = {language: memory.lookup(source_language, language, context, first_seen)
+                 for language in target_languages}
+    except sqlite3.Error as e:
+        print(f"⚠️ Translation memory unavailable: {e}", file=sys.stderr)
+        return None
+
+    pending = [language for language in target_languages if len(known[language]) < len(first_seen)]
+    missing = [key for key in first_seen if any(key not in known[language] for language in pending)]
+    if pending:
+        answer = translate_lines([first_seen[key] for key in missing], pending) or {}
+        for language in pending:
+            translated = answer.get(language)
+            if not translated or len(translated) != len(missing):
+                print(f"⚠️ Translation memory: {language} answer for {len(missing)} lines could not be mapped back",
+                      file=sys.stderr)
+                del known[language]
+                continue
+
+            new = {key: line for key, line in zip(missing, translated) if key not in known[language]}
+            try:
+                memory.store(source_language, language, context, new)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not store translations: {e}", file=sys.stderr)
+            known[language].update(new)
+
+    for language in known:
+        sent = len(missing) if language in pending else 0
+        print(f"🧠 Translation memory {source_language}->{language}: sent {sent} of "
+              f"{len(lines)} lines ({len(first_seen) - sent} known)", file=sys.stderr)
+    return {language: "\n".join(translated[key] for key in keys) for language, translated in known.items()}
@@ -3,17 +3,36 @@
 Two-step lyrics processing system:
 1. LLM analyzes and generates clean lyrics in utils directory
 2. LLM reviews its output and saves only final clean lyrics to text files
+
+In single-call mode (the default) step 1 answers in a strict <lyrics> block that is
+parsed locally; step 2 only runs when that parse fails.
 """
 
 import os
+import re
 import sys
+import threading
 from openai import OpenAI
 from dotenv import load_dotenv
 
 # Add utils directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend', 'utils'))
 
-from boson_client import client
+from boson_client import get_client
+from llm_cache import cached_chat_completion
+from progress import report
+from translation_memory import memory_context, numbered_request, parse_numbered_lines, translate_with_memory
+from language_id import LANGUAGE_ID_THRESHOLD, identify_text_language
+
+STEP1_MODEL = "Qwen3-32B-thinking-Hackathon"
+
+# Parse step 1 locally and skip step 2 unless parsing fails
+SINGLE_CALL = os.getenv("LYRICS_SINGLE_CALL", "true").lower() in ("1", "true", "yes")
+
+_LYRICS_BLOCK = re.compile(r"<lyrics>\s*(.*?)\s*</lyrics>", re.DOTALL | re.IGNORECASE)
+
+_stats = {"single_call": 0, "fallback": 0}
+_stats_lock = threading.Lock()
 
 def post_process_clean_lyrics(text):
     """
@@ -23,8 +42,9 @@ def post_process_clean_lyrics(text):
         return ""
     
     # First, remove <think> tags and their content
-    import re
     text = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
+    # Then the single-call lyrics delimiters, if step 2 copied them
+    text = re.sub(r'</?lyrics>', '', text, flags=re.IGNORECASE)
     
     lines = text.split('\n')
     clean_lines = []
@@ -55,14 +75,60 @@ def post_process_clean_lyrics(text):
     
     return '\n'.join(clean_lines)
 
-def step1_analyze_and_generate_clean_lyrics(transcription, target_language="Spanish"):
+def parse_lyrics_output(text):
     """
-    Step 1: LLM analyzes the transcription and generates clean lyrics.
-    This happens in the utils directory.
+    Deterministically extract the lyrics from a step 1 answer.
+    
+    Drops <think> blocks (and anything before a stray closing tag), then takes the last
+    <lyrics>...</lyrics> block. An unclosed <think> means the answer was cut off while
+    reasoning, so any lyrics in it are a draft and are rejected.
+    
+    Returns:
+        str: One lyric per line, or None if the answer does not follow the contract
     """
-    print(f"🧠 Step 1: LLM analyzing and generating clean {target_language} lyrics...")
+    if not text:
+        return None
+    
+    text = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
+    if '</think>' in text:
+        text = text.rsplit('</think>', 1)[1]
+    if '<think>' in text:
+        return None
+    
+    blocks = _LYRICS_BLOCK.findall(text)
+    if not blocks:
+        return None
     
-    system_prompt = f"""You are a professional song translator. Your task is to analyze the given transcription and generate clean, translated lyrics.
+    lines = [line.strip() for line in blocks[-1].split('\n') if line.strip()]
+    return '\n'.join(lines) or None
+
+def _record_parse(target_language, fallback):
+    """Count single-call answers and step 2 fallbacks, and report the running fallback rate."""
+    with _stats_lock:
+        _stats["single_call"] += 1
+        if fallback:
+            _stats["fallback"] += 1
+        rate = _stats["fallback"] / _stats["single_call"]
+    report("lyrics_parsed", language=target_language, fallback=fallback, fallback_rate=round(rate, 3))
+    if fallback:
+        print(f"⚠️ Could not parse {target_language} lyrics locally, falling back to step 2 "
+              f"(fallback rate {rate:.0%})", file=sys.stderr)
+
+def get_fallback_stats():
+    """
+    Get how often single-call mode needed the step 2 call in this process.
+    
+    Returns:
+        dict: {"single_call": answers parsed, "fallback": step 2 calls, "fallback_rate": ratio}
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["fallback_rate"] = stats["fallback"] / stats["single_call"] if stats["single_call"] else 0.0
+    return stats
+
+def _step1_system_prompt(target_language):
+    """System prompt for step 1; also part of the translation memory key."""
+    return f"""You are a professional song translator. Your task is to analyze the given transcription and generate clean, translated lyrics.
 
 ANALYSIS PHASE (do this internally):
 1. Analyze the original lyrics for:
@@ -89,11 +155,21 @@ OUTPUT REQUIREMENTS:
 - Do NOT include any metadata or formatting
 - Maintain the exact same line structure as the original
 - Each line should be a direct translation of the corresponding original line
-- Start immediately with the first translated line, no introduction"""
+- Wrap the lyrics in a single <lyrics> and </lyrics> block, one translated line per line
+- Nothing may follow </lyrics>"""
+
+def step1_analyze_and_generate_clean_lyrics(transcription, target_language="Spanish"):
+    """
+    Step 1: LLM analyzes the transcription and generates clean lyrics.
+    This happens in the utils directory.
+    """
+    print(f"🧠 Step 1: LLM analyzing and generating clean {target_language} lyrics...")
+    
+    system_prompt = _step1_system_prompt(target_language)
 
     try:
-        response = client.chat.completions.create(
-            model="Qwen3-32B-thinking-Hackathon",
+        response = get_client().chat.completions.create(
+            model=STEP1_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Translate these lyrics to {target_language}:\n\n{transcription}"}
@@ -102,7 +178,7 @@ OUTPUT REQUIREMENTS:
             temperature=0.3,
         )
         
-        raw_translation = response.choices[0].message.content.strip()
+        raw_translation = (response.choices[0].message.content or "").strip()
         print(f"✅ Step 1 completed - Generated raw translation")
         return raw_translation
         
@@ -129,7 +205,8 @@ CRITICAL INSTRUCTIONS:
 - Output ONLY the clean translated lyrics in {target_language}"""
 
     try:
-        response = client.chat.completions.create(
+        response = cached_chat_completion(
+            get_client(),
             model="Qwen3-32B-thinking-Hackathon",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -151,10 +228,40 @@ CRITICAL INSTRUCTIONS:
         print(f"❌ Step 2 failed: {e}")
         return raw_translation  # Fallback to raw translation
 
-def process_transcription_with_two_steps(transcription, target_language="Spanish"):
+def process_transcription_with_two_steps(transcription, target_language="Spanish", single_call=None,
+                                         source_language=None):
     """
     Process transcription using the two-step system.
+    
+    Args:
+        transcription (str): Original lyrics
+        target_language (str): Language to translate into
+        single_call (bool): Parse step 1 locally and only run step 2 if that fails
+            (default LYRICS_SINGLE_CALL)
+        source_language (str): Language of the lyrics, for the translation memory
+            (default: identified locally from the text)
     """
+    single_call = SINGLE_CALL if single_call is None else single_call
+    if not source_language:
+        source_language, confidence = identify_text_language(transcription)
+        if confidence < LANGUAGE_ID_THRESHOLD:
+            source_language = None
+    
+    def translate_lines(lines):
+        # Numbered lines map back one-to-one, so neither step 2 nor the lossy cleanup is needed
+        raw_translation = step1_analyze_and_generate_clean_lyrics(numbered_request(lines), target_language)
+        return parse_numbered_lines(parse_lyrics_output(raw_translation) or raw_translation, len(lines))
+    
+    # Repeated and previously translated lines are not sent again
+    final_lyrics = translate_with_memory(
+        transcription, source_language, target_language, translate_lines,
+        context=memory_context(STEP1_MODEL, _step1_system_prompt(target_language)),
+    )
+    if final_lyrics:
+        return final_lyrics
+    return _translate_two_steps(transcription, target_language, single_call)
+
+def _translate_two_steps(transcription, target_language, single_call):
     print(f"🎵 Processing {target_language} translation with two-step system")
     print("=" * 60)
     
@@ -163,6 +270,14 @@ def process_transcription_with_two_steps(transcription, target_language="Spanish
     if not raw_translation:
         return None
     
+    if single_call:
+        final_lyrics = parse_lyrics_output(raw_translation)
+        _record_parse(target_language, fallback=final_lyrics is None)
+        if final_lyrics:
+            print(f"🎉 Single-call process completed for {target_language}")
+            print("=" * 60)
+            return final_lyrics
+    
     # Step 2: Extract final lyrics
     final_lyrics = step2_review_and_extract_final_lyrics(raw_translation, target_language)
     if not final_lyrics:
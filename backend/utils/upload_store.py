@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Content-addressed storage for uploaded audio files
+Streams uploads to disk in fixed-size chunks and names them by their SHA-256
+"""
+
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def upload_extension(filename):
+    """Get a safe lowercase file extension (e.g. '.mp3') from an uploaded filename."""
+    suffix = Path(filename or "").suffix.lower()
+    if not suffix or not suffix[1:].isalnum():
+        return ""
+    return suffix
+
+
+def file_sha256(file_path, chunk_size=CHUNK_SIZE):
+    """Compute the SHA-256 of a file on disk without loading it into memory."""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+async def store_upload(upload_file, upload_dir, chunk_size=CHUNK_SIZE):
+    """
+    Stream an UploadFile to disk under its content hash.
+
+    Identical uploads map to the same file, so a second upload of the same song
+    is deduplicated and memory use stays at one chunk regardless of file size.
+
+    Args:
+        upload_file (UploadFile): Incoming FastAPI upload
+        upload_dir (str | Path): Directory to store uploads in
+        chunk_size (int): Bytes read per chunk
+
+    Returns:
+        tuple: (Path to stored file, SHA-256 hex digest)
+    """
+    upload_dir = Path(upload_dir)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    sha256 = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = await upload_file.read(chunk_size)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                buffer.write(chunk)
+
+        digest = sha256.hexdigest()
+        file_path = upload_dir / f"{digest}{upload_extension(upload_file.filename)}"
+
+        if file_path.exists():
+            # Same content already stored, keep the existing copy
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+
+        return file_path, digest
+
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -6,7 +6,7 @@ Based on the official GitHub example for voice cloning
 
 import os
 import base64
-from openai import OpenAI
+from boson_client import get_client
 
 class VoiceCloner:
     """
@@ -16,14 +16,7 @@ class VoiceCloner:
     
     def __init__(self):
         """Initialize the voice cloner with Boson AI client."""
-        self.boson_api_key = "bai-983X8jWnN1Acm57MI3t-d4BqmxkDX_DxMyNAJQBJyB9WEyZ8"
-        if not self.boson_api_key:
-            raise ValueError("BOSON_API_KEY environment variable not set")
-        
-        self.client = OpenAI(
-            api_key=self.boson_api_key, 
-            base_url="https://hackathon.boson.ai/v1"
-        )
+        self.client = get_client()
         self.model = "higgs-audio-generation-Hackathon"
     
     def b64_encode(self, file_path):
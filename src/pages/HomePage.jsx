@@ -194,6 +194,25 @@ function HomePage() {
     }
   }, []);
 
+  const waitForJob = async (jobId, intervalMs = 2000, timeoutMs = 600000) => {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      const response = await fetch(`http://localhost:8000/jobs/${jobId}`);
+      if (!response.ok) {
+        throw new Error(`Job ${jobId} status request failed: ${response.status}`);
+      }
+      const job = await response.json();
+      if (job.status === 'completed') {
+        return job;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || `Job ${jobId} failed`);
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+    throw new Error(`Job ${jobId} timed out`);
+  };
+
   const processAudioFile = async (file) => {
     setIsProcessing(true);
     try {
@@ -214,11 +233,16 @@ function HomePage() {
           const data = await response.json();
           console.log('Backend API response:', data);
           
-          if (data.lyrics) {
-            setDetectedLanguage(data.lyrics.detected_language || 'Unknown');
-            setOriginalLyrics(data.lyrics.original_lyrics || []);
-            setTranslatedLyrics(data.lyrics.translated_lyrics || []);
-            setCurrentLanguage(data.lyrics.detected_language || 'Unknown');
+          // Processing runs as a background job; poll it until it finishes
+          const job = await waitForJob(data.job_id);
+          console.log('Backend job finished:', job);
+          
+          const lyrics = job.result && job.result.lyrics;
+          if (lyrics) {
+            setDetectedLanguage(lyrics.detected_language || 'Unknown');
+            setOriginalLyrics(lyrics.original_lyrics || []);
+            setTranslatedLyrics(lyrics.translated_lyrics || []);
+            setCurrentLanguage(lyrics.detected_language || 'Unknown');
             return;
           }
         }